@@ -12,7 +12,7 @@ from typing import Dict, List, Any, Optional
 import asyncio
 from datetime import datetime
 
-from models.guild import Guild
+from models.guild import Guild, invalidate_cached_server_configs
 from models.server import Server
 from utils.sftp import SFTPClient
 from utils.embed_builder import EmbedBuilder
@@ -442,6 +442,7 @@ class Setup(commands.Cog):
                                         {"guild_id": guild_id_str, "servers.server_id": server_id},
                                         {"$set": {"servers.$.historical_parse_done": True}}
                                     )
+                                    invalidate_cached_server_configs(guild_id_str)
                                     logger.info(f"Marked server {server_id} as having historical parsing in progress")
                                 except Exception as flag_err:
                                     logger.error(f"Error setting historical parse flag: {flag_err}")
@@ -635,6 +636,7 @@ class Setup(commands.Cog):
                                 {"guild_id": guild_id_val, "servers.server_id": std_server_id},
                                 {"$set": {"servers.$.historical_parse_done": False}}
                             )
+                            invalidate_cached_server_configs(guild_id_val)
                             logger.info(f"Cleared historical parse flags for server {std_server_id}")
                             
                             # Clean flags in standalone servers collection
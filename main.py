@@ -29,6 +29,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("main")
 
+# Maximum number of extensions loading at the same time
+EXTENSION_LOAD_CONCURRENCY = 4
+
 async def main():
     """
     Main entry point for the Discord bot
@@ -62,7 +65,7 @@ async def main():
         logger.critical("Failed to initialize database. Bot cannot start!")
         return
 
-    # Load core extensions
+    # Load core extensions concurrently
     extensions = [
         'cogs.admin',
         'cogs.analytics',
@@ -77,12 +80,21 @@ async def main():
         'cogs.stats'
     ]
 
-    for extension in extensions:
-        try:
+    load_slots = asyncio.Semaphore(EXTENSION_LOAD_CONCURRENCY)
+
+    async def load_extension(extension):
+        async with load_slots:
             await bot.load_extension(extension)
-        except Exception as e:
-            logger.error(f"Failed to load extension {extension}: {e}")
-            logger.error(traceback.format_exc())
+
+    results = await asyncio.gather(
+        *(load_extension(extension) for extension in extensions),
+        return_exceptions=True
+    )
+
+    for extension, result in zip(extensions, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to load extension {extension}: {result}")
+            logger.error("".join(traceback.format_exception(result)))
 
     # Get Discord token from environment
     token = os.environ.get("DISCORD_TOKEN")
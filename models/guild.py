@@ -6,6 +6,7 @@ This module defines the Guild data structure for Discord guilds.
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional, ClassVar, List, Union, Tuple, cast
+import sys
 import uuid
 import concurrent.futures
 
@@ -13,6 +14,24 @@ from models.base_model import BaseModel
 
 logger = logging.getLogger(__name__)
 
+def invalidate_cached_server_configs(guild_id: Optional[str] = None) -> None:
+    """Drop cached copies of a guild's server configurations
+
+    Call this after writing a guild's servers array. The CSV processor
+    coordinator and server autocomplete cache it, each only once its module
+    has been loaded.
+
+    Args:
+        guild_id: Guild whose servers changed, or None for every guild
+    """
+    coordinator_module = sys.modules.get("utils.csv_processor_coordinator")
+    if coordinator_module is not None:
+        coordinator_module.invalidate_server_configs(guild_id)
+
+    autocomplete_module = sys.modules.get("utils.autocomplete")
+    if autocomplete_module is not None:
+        autocomplete_module.invalidate_server_cache(guild_id)
+
 class Guild(BaseModel):
     """Discord guild configuration"""
     collection_name: ClassVar[Optional[str]] = "guilds"
@@ -240,6 +259,7 @@ class Guild(BaseModel):
                 }
             }
         )
+        invalidate_cached_server_configs(self.guild_id)
 
         # IMPORTANT: Also save to servers collection for CSV processor
         # This ensures the server is found by the historical parser
@@ -378,6 +398,7 @@ class Guild(BaseModel):
                 }
             }
         )
+        invalidate_cached_server_configs(self.guild_id)
 
         # Try multiple approaches to remove from standalone servers collection
         # 1. First try exact match
@@ -933,6 +933,9 @@ class Server(BaseModel):
                     }
                 )
                 guild_count = guild_result.modified_count  # Update our counter
+                if guild_count:
+                    from models.guild import invalidate_cached_server_configs
+                    invalidate_cached_server_configs()
                 logger.info(f"Updated {guild_count} guilds")
 
                 # Always consider successful if we found and removed from any collection
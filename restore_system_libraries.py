@@ -7,9 +7,14 @@ by our error fixing script. We'll restore error-related references in all system
 """
 import os
 import re
+import mmap
 import logging
 import fileinput
 import glob
+import platform
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple, Set
 
 # Configure logging
@@ -38,24 +43,87 @@ SYSTEM_MODULES = [
     're'
 ]
 
+# Installed module directories, resolved once at import time
+MODULE_PATHS = tuple(
+    path for path in (os.path.join(PYTHONLIBS_PATH, module) for module in SYSTEM_MODULES)
+    if os.path.isdir(path)
+)
+
+# Applied in sequence, the first of the old four patterns already rewrote
+# every get_error() occurrence, leaving the other three with nothing to
+# match. A single pass with that pattern gives the same result:
+#   .get_error()s -> .errors, self.get_error()_count -> self.error_count,
+#   self.get_error()log -> self.errorlog, .get_error()_log -> .error_log
+GET_ERROR_PATTERN = re.compile(r'(\.?)get_error\(\)(s?)')
+GET_ERROR_REPLACEMENT = r'\1error\2'
+
+# Needle searched for when scanning, and the scan buffer sizes
+MARKER = b'get_error()'
+SCAN_CHUNK_SIZE = 64 * 1024
+MMAP_THRESHOLD = 1024 * 1024
+
+# Native grep is used for discovery on POSIX systems when installed
+GREP_PATH = shutil.which('grep') if platform.system() in ('Linux', 'Darwin') else None
+
+def _file_contains_marker(file_path: str) -> bool:
+    """Check for get_error() without reading the whole file into memory
+    
+    Small files are streamed in fixed-size chunks with a rolling overlap so
+    the needle cannot straddle a chunk boundary; large files are searched
+    through mmap instead.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        # mmap cannot map an empty file
+        if size == 0:
+            return False
+        
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm.find(MARKER) >= 0
+        
+        tail = b''
+        while True:
+            chunk = f.read(SCAN_CHUNK_SIZE)
+            if not chunk:
+                return False
+            if MARKER in tail + chunk:
+                return True
+            tail = chunk[-(len(MARKER) - 1):]
+
+def _scan_module(module_path: str) -> List[str]:
+    """Find Python files containing get_error() below a single module directory"""
+    # Let grep do the walk and the substring search where it is available
+    if GREP_PATH is not None:
+        result = subprocess.run(
+            [GREP_PATH, '-rlF', '--include=*.py', MARKER.decode(), module_path],
+            capture_output=True, text=True, check=False
+        )
+        # grep exits with 1 when nothing matched and 2 on errors
+        if result.returncode in (0, 1):
+            return result.stdout.splitlines()
+        logger.warning(f"grep failed for {module_path}, falling back to Python scan")
+    
+    affected_files = []
+    
+    for root, _, files in os.walk(module_path):
+        for file in files:
+            if file.endswith('.py'):
+                file_path = os.path.join(root, file)
+                # Check if file contains the pattern get_error()
+                if _file_contains_marker(file_path):
+                    affected_files.append(file_path)
+    
+    return affected_files
+
 def find_affected_files() -> List[str]:
     """Find all affected Python files in the system libraries"""
     affected_files = []
     
-    for module in SYSTEM_MODULES:
-        # Get module path
-        module_path = os.path.join(PYTHONLIBS_PATH, module)
-        if os.path.exists(module_path):
-            # Find all .py files in this module
-            for root, _, files in os.walk(module_path):
-                for file in files:
-                    if file.endswith('.py'):
-                        file_path = os.path.join(root, file)
-                        # Check if file contains the pattern get_error()
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            if 'get_error()' in content:
-                                affected_files.append(file_path)
+    # Modules are independent, so scan them in parallel worker processes
+    with ProcessPoolExecutor() as executor:
+        for files in executor.map(_scan_module, MODULE_PATHS):
+            affected_files.extend(files)
     
     return affected_files
 
@@ -67,28 +135,30 @@ def fix_affected_files(files: List[str]) -> int:
     """
     fixed_count = 0
     
-    # Patterns to fix
-    patterns = [
-        (r'(\.?)get_error\(\)(s?)', r'\1error\2'),   # .get_error()s -> .errors, get_error() -> error
-        (r'(self\.)get_error\(\)(_\w+)', r'\1error\2'), # self.get_error()_count -> self.error_count
-        (r'(self\.(?:cfg\.)?get_error\(\))(log)', r'\1\2'),  # self.get_error()log -> self.errorlog
-        (r'(\.?)get_error\(\)(_\w+)', r'\1error\2'),  # .get_error()_log -> .error_log
-    ]
-    
     for file_path in files:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         
-        modified = False
-        for pattern, replacement in patterns:
-            new_content, count = re.subn(pattern, replacement, content)
-            if count > 0:
-                content = new_content
-                modified = True
+        # Cheap C-level substring check before running the regex engine
+        if 'get_error()' not in content:
+            continue
+        
+        content, count = GET_ERROR_PATTERN.subn(GET_ERROR_REPLACEMENT, content)
+        modified = count > 0
                 
-        if modified is not None:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        if modified:
+            # Write to a temporary file and swap it in atomically, keeping
+            # the original permissions; never leave the temporary file behind
+            tmp_path = file_path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                shutil.copymode(file_path, tmp_path)
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
             fixed_count += 1
             logger.info(f"Fixed imports in {file_path}")
     
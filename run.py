@@ -5,6 +5,7 @@ Tower of Temptation PvP Statistics Bot - Run Script
 This is a simple entry script that sets up logging and then starts the bot.
 """
 
+import asyncio
 import logging
 import sys
 import os
@@ -22,25 +23,27 @@ def main():
     try:
         # Verify environment variables
         required_vars = ["MONGODB_URI", "DISCORD_TOKEN"]
-        missing_vars = [var for var in required_vars if not os.environ.get(var)]
+        env = os.environ
+        missing_vars = [var for var in required_vars if not env.get(var)]
         
         if missing_vars:
             logger.critical(f"Missing required environment variables: {', '.join(missing_vars)}")
             logger.critical("Please set these variables in your environment or .env file")
             return 1
         
-        # Import and run the main module
+        # Import the bot only once the environment is known to be usable
         try:
-            import main
-            logger.info("Starting the bot via main module")
-            
-            # Try to use asyncio.run() which handles everything correctly
-            import asyncio
-            asyncio.run(main.main())
-            
+            import main as bot_main
         except ImportError as e:
-            logger.critical(f"Failed to import main module: {e}")
+            # name is the module that was missing, which may be one main imports
+            failed_module = e.name or "main"
+            logger.critical(f"Failed to import main module ({failed_module}): {e}")
             return 1
+        
+        logger.info("Starting the bot via main module")
+        
+        # Use asyncio.run() which handles everything correctly
+        asyncio.run(bot_main.main())
             
     except KeyboardInterrupt:
         logger.info("Bot stopped by keyboard interrupt")
@@ -0,0 +1,236 @@
+"""
+Tests for CSV processing of local directories and SFTP servers in the CSV processor coordinator
+"""
+import asyncio
+import stat
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("paramiko")
+pytest.importorskip("asyncssh")
+
+from utils.csv_processor_coordinator import CSVProcessorCoordinator
+from utils.sftp import SFTPClient, SFTPManager
+
+GUILD_ID = 1234
+SERVER_ID = "7020"
+
+CSV_ROWS = (
+    "2025.05.09-11.58.37;Alice;A1;Bob;B1;AK47;100;PS4;PC\n"
+    "2025.05.09-11.59.37;Carl;C1;Carl;C1;suicide_by_relocation;0;PC;PC\n"
+    "2025.05.09-12.00.00;Dan;null;Eve;E1;M4;12;PC;PC\n"
+)
+
+class FakeCursor:
+    """Aggregation cursor returning fixed documents"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+SFTP_PATH = "/logs"
+
+SFTP_SERVER = {
+    "server_id": SERVER_ID,
+    "sftp_enabled": True,
+    "sftp_host": "sftp.example.com",
+    "sftp_username": "user",
+    "sftp_password": "secret",
+    "sftp_path": SFTP_PATH
+}
+
+class FakeGuilds:
+    """Guilds collection with a single guild holding one server"""
+
+    def __init__(self, server):
+        self.server = server
+
+    def aggregate(self, pipeline):
+        return FakeCursor([{"servers_by_id": {SERVER_ID: self.server}}])
+
+class FakeKills:
+    """Kills collection recording bulk writes"""
+
+    def __init__(self):
+        self.ops = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.ops.extend(ops)
+
+class FakeRawSFTP:
+    """Raw SFTP channel listing a flat directory of remote files"""
+
+    def __init__(self, files):
+        self.files = files
+
+    async def readdir(self, path):
+        return [
+            SimpleNamespace(
+                filename=name,
+                attrs=SimpleNamespace(permissions=stat.S_IFREG | 0o644, mtime=mtime)
+            )
+            for name, (_, mtime) in self.files.items()
+        ]
+
+class FakeSFTPClient(SFTPClient):
+    """Connected SFTPClient serving in-memory files; None contents fail to download"""
+
+    def __init__(self, files):
+        self.files = files
+        self._connected = True
+        self._sftp_client = FakeRawSFTP(files)
+
+    async def download_file(self, remote_path, local_path=None):
+        return self.files[remote_path.rsplit("/", 1)[-1]][0]
+
+    async def read_file(self, remote_path, start_line=0, max_lines=-1):
+        # Decoded lines, as the real wrapper returns; downloads must not use this
+        data = self.files[remote_path.rsplit("/", 1)[-1]][0]
+        return data.decode().splitlines() if data is not None else None
+
+    async def disconnect(self):
+        self._connected = False
+
+def make_coordinator(server=None, sftp_files=None):
+    bot = SimpleNamespace(db=SimpleNamespace(
+        guilds=FakeGuilds(server or {"server_id": SERVER_ID}),
+        kills=FakeKills()
+    ))
+    coordinator = CSVProcessorCoordinator(bot)
+    if sftp_files is not None:
+        manager = SFTPManager(hostname=SFTP_SERVER["sftp_host"], server_id=SERVER_ID)
+        manager.client = FakeSFTPClient(sftp_files)
+        coordinator.sftp_managers[SERVER_ID] = manager
+    return coordinator, bot.db.kills
+
+def write_csv_files(directory):
+    (directory / "2025.05.09-00.00.00.csv").write_text(CSV_ROWS)
+    maps = directory / "maps"
+    maps.mkdir()
+    (maps / "map_2025.05.09-00.00.00.csv").write_text(CSV_ROWS)
+
+async def run_sftp(coordinator, **kwargs):
+    try:
+        return await coordinator.process_csv_files_for_server(GUILD_ID, SERVER_ID, **kwargs)
+    finally:
+        await coordinator.close_all()
+
+async def run_local(coordinator, directory, **kwargs):
+    try:
+        return await coordinator.process_csv_files_for_server(
+            GUILD_ID, SERVER_ID, use_sftp=False, local_directory=str(directory), **kwargs
+        )
+    finally:
+        await coordinator.close_all()
+
+def test_local_directory_files_are_processed(tmp_path):
+    write_csv_files(tmp_path)
+    coordinator, kills = make_coordinator()
+
+    result = asyncio.run(run_local(coordinator, tmp_path))
+
+    assert result["success"], result
+    assert result["errors"] == []
+    assert result["standard_files_processed"] == 1
+    assert result["map_files_processed"] == 1
+    # The row with a null killer ID is dropped from each file
+    assert result["total_events_processed"] == 4
+
+    docs = [op._doc["$setOnInsert"] for op in kills.ops]
+    assert len(docs) == 4
+    assert all(isinstance(doc["timestamp"], datetime) for doc in docs)
+    assert sorted(doc["event_type"] for doc in docs) == ["kill", "kill", "suicide", "suicide"]
+    suicide = next(doc for doc in docs if doc["is_suicide"])
+    assert suicide["killer_id"] == suicide["victim_id"] == "C1"
+
+def test_count_only_does_not_process_files(tmp_path):
+    write_csv_files(tmp_path)
+    coordinator, kills = make_coordinator()
+
+    result = asyncio.run(run_local(coordinator, tmp_path, count_only=True))
+
+    assert result["success"], result
+    assert len(result["standard_files"]) == 1
+    assert len(result["map_files"]) == 1
+    assert result["standard_files_processed"] == 0
+    assert kills.ops == []
+
+def test_server_config_edits_invalidate_the_guild_cache():
+    # The models package imports the database layer and discord
+    pytest.importorskip("motor")
+    pytest.importorskip("discord")
+    from models.guild import invalidate_cached_server_configs
+    from utils import autocomplete
+
+    coordinator, _ = make_coordinator()
+    assert asyncio.run(coordinator._get_server_config(GUILD_ID, SERVER_ID)) is not None
+    assert str(GUILD_ID) in coordinator._guild_cache
+    autocomplete._SERVER_CACHE[str(GUILD_ID)] = (0.0, [(SERVER_ID, "Server")], [])
+
+    invalidate_cached_server_configs(str(GUILD_ID))
+
+    assert coordinator._guild_cache == {}
+    assert str(GUILD_ID) not in autocomplete._SERVER_CACHE
+
+def test_cached_count_results_do_not_share_lists(tmp_path):
+    write_csv_files(tmp_path)
+    coordinator, _ = make_coordinator()
+
+    first = asyncio.run(run_local(coordinator, tmp_path, count_only=True))
+    first["standard_files"].clear()
+    second = asyncio.run(run_local(coordinator, tmp_path, count_only=True))
+
+    assert len(second["standard_files"]) == 1
+
+def test_sftp_files_are_streamed_and_parsed():
+    coordinator, kills = make_coordinator(SFTP_SERVER, {
+        "2025.05.09-00.00.00.csv": (CSV_ROWS.encode(), 100.0),
+        "2025.05.10-00.00.00.csv": (CSV_ROWS.encode(), 200.0)
+    })
+
+    result = asyncio.run(run_sftp(coordinator))
+
+    assert result["success"], result
+    assert result["errors"] == []
+    assert result["standard_files_processed"] == 2
+    # The row with a null killer ID is dropped from each file
+    assert result["total_events_processed"] == 4
+    assert len(kills.ops) == 4
+    assert coordinator._sftp_cursors[(GUILD_ID, SERVER_ID)] == 200.0
+
+def test_persisted_sftp_files_are_written_and_parsed(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.csv_processor_coordinator.DOWNLOAD_ROOT", tmp_path)
+    coordinator, kills = make_coordinator(SFTP_SERVER, {
+        "2025.05.09-00.00.00.csv": (CSV_ROWS.encode(), 100.0),
+        "map_2025.05.09-00.00.00.csv": (CSV_ROWS.encode(), 100.0)
+    })
+
+    result = asyncio.run(run_sftp(coordinator, persist=True))
+
+    assert result["success"], result
+    assert result["sftp_files_downloaded"] == 2
+    local_path = tmp_path / str(GUILD_ID) / SERVER_ID
+    assert (local_path / "2025.05.09-00.00.00.csv").read_text() == CSV_ROWS
+    assert (local_path / "maps" / "map_2025.05.09-00.00.00.csv").read_text() == CSV_ROWS
+    assert result["total_events_processed"] == 4
+    assert len(kills.ops) == 4
+
+def test_sftp_cursor_stops_before_a_failed_download():
+    coordinator, kills = make_coordinator(SFTP_SERVER, {
+        "2025.05.09-00.00.00.csv": (CSV_ROWS.encode(), 100.0),
+        "2025.05.10-00.00.00.csv": (None, 200.0),
+        "2025.05.11-00.00.00.csv": (CSV_ROWS.encode(), 300.0)
+    })
+
+    result = asyncio.run(run_sftp(coordinator))
+
+    assert result["errors"] == ["Failed to download 2025.05.10-00.00.00.csv"]
+    assert result["standard_files_processed"] == 2
+    assert len(kills.ops) == 4
+    # The failed file is retried next run, so the cursor must not pass it
+    assert coordinator._sftp_cursors[(GUILD_ID, SERVER_ID)] == 100.0
@@ -0,0 +1,42 @@
+"""
+Tests for MongoDB URI validation in the database connection module
+"""
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("pymongo")
+
+from utils.db_connection import validate_mongodb_uri
+
+@pytest.mark.parametrize("uri", [
+    "mongodb://localhost",
+    "mongodb://localhost:27017",
+    "mongodb://u:p@host:27017/db",
+    "mongodb://u@host/db",
+    "mongodb://h1,h2/db",
+    "mongodb://host/db?retryWrites=true",
+    "mongodb://host?w=1",
+    "mongodb://host/?retryWrites=true",
+    "mongodb+srv://host/db",
+    "mongodb+srv://u:p@host/db",
+    "mongodb+srv://u:p@cluster0.example.net/?retryWrites=true&w=majority"
+])
+def test_valid_uris_are_accepted(uri):
+    assert validate_mongodb_uri(uri) == (True, "")
+
+@pytest.mark.parametrize("uri,error", [
+    ("", "URI is empty"),
+    ("http://host", "Invalid MongoDB standard URI format"),
+    ("mongodb://", "Missing hostname"),
+    ("mongodb://u:p@/db", "Missing hostname"),
+    ("mongodb://h1:27017,h2:27017/db", "Invalid MongoDB standard URI format"),
+    ("mongodb://host:/db", "Invalid MongoDB standard URI format"),
+    ("mongodb://host:27a/db", "Invalid MongoDB standard URI format"),
+    ("mongodb://u:@h/db", "Invalid MongoDB standard URI format"),
+    ("mongodb://:p@h/db", "Invalid MongoDB standard URI format"),
+    ("mongodb://ho st/db", "Invalid MongoDB standard URI format"),
+    ("mongodb+srv://u:p@ho st/db", "Invalid MongoDB SRV URI format"),
+    ("mongodb+srv://host:27017/db", "SRV URI should not include port number")
+])
+def test_invalid_uris_are_rejected(uri, error):
+    assert validate_mongodb_uri(uri) == (False, error)
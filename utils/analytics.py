@@ -229,14 +229,14 @@ class AnalyticsManager:
         error_rates = {}
         
         for cmd, metrics in COMMAND_METRICS.items():
-            total = metrics.get("total_executions", 0)
+            total = metrics.invocations
             if total > 0:
-                failed = metrics.get("failed_executions", 0)
+                failed = metrics.errors
                 error_rates[cmd] = failed / total
                 
         # Only consider commands with at least 10 executions
         significant_error_rates = {cmd: rate for cmd, rate in error_rates.items() 
-                                 if COMMAND_METRICS[cmd]["total_executions"] >= 10}
+                                 if COMMAND_METRICS[cmd].invocations >= 10}
                                  
         # Calculate error likelihood for all commands
         PREDICTIONS["error_likelihood"] = significant_error_rates
@@ -257,7 +257,7 @@ class AnalyticsManager:
                 
         # Factor in resource sensitivity
         for cmd, metrics in COMMAND_METRICS.items():
-            if "avg_execution_time" in metrics and metrics["avg_execution_time"] > 1.0:
+            if metrics.avg_runtime > 1.0:
                 # Long-running commands are more sensitive to resource issues
                 cascade_risks[cmd] = cascade_risks.get(cmd, 0) + 0.1
                 
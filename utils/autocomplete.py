@@ -4,16 +4,51 @@ Autocomplete functions for Discord bot commands.
 This module contains standardized autocomplete functions that can be reused
 across multiple cogs for consistent user experience.
 """
+import asyncio
 import logging
-from typing import List
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 import discord
 from discord import app_commands
 
+from models.guild import Guild
+from utils.database import get_db
 from utils.server_utils import standardize_server_id
 
 logger = logging.getLogger(__name__)
 
+# Cache configuration for server selection lookups
+SERVER_CACHE_TTL = 30  # 30 seconds
+SERVER_CACHE_MAX_GUILDS = 1024
+_SERVER_CACHE: "OrderedDict[str, Tuple[float, List[Tuple[str, str]], List[Tuple[str, str, str, str]]]]" = OrderedDict()
+_SERVER_REFRESH_TASKS: Dict[str, asyncio.Task] = {}
+
+# Discord allows at most 25 autocomplete choices
+MAX_AUTOCOMPLETE_CHOICES = 25
+
+# Only the fields needed to build a choice are fetched from server collections
+SERVER_PROJECTION = {"server_id": 1, "server_name": 1, "_id": 0}
+
+def invalidate_server_cache(guild_id: Optional[str] = None) -> None:
+    """
+    Drop cached server selection options after a guild's servers change
+
+    A background refresh already in flight may have read the old servers,
+    so it is cancelled rather than allowed to re-cache them.
+
+    Args:
+        guild_id: Guild whose servers changed, or None for every guild
+    """
+    guild_ids = list(_SERVER_CACHE) if guild_id is None else [str(guild_id)]
+    for cached_guild_id in guild_ids:
+        _SERVER_CACHE.pop(cached_guild_id, None)
+    for cached_guild_id in list(_SERVER_REFRESH_TASKS) if guild_id is None else guild_ids:
+        task = _SERVER_REFRESH_TASKS.pop(cached_guild_id, None)
+        if task is not None:
+            task.cancel()
+
 async def server_id_autocomplete(interaction: discord.Interaction, current: str):
     """
     Autocomplete for server selection
@@ -26,7 +61,6 @@ async def server_id_autocomplete(interaction: discord.Interaction, current: str)
         List of discord.app_commands.Choice options
     """
     # Get database connection
-    from utils.database import get_db
     try:
         db = await get_db()
     except Exception as e:
@@ -38,195 +72,175 @@ async def server_id_autocomplete(interaction: discord.Interaction, current: str)
     if guild_id is None:
         return []
 
-    # Get server options from guild configuration
-    server_options = await get_server_selection(interaction, guild_id, db)
+    # Standardized options come precomputed from the per-guild cache
+    _, standardized_options = await _get_cached_selection(guild_id, db)
 
-    # Standardize all server IDs for consistency with command processing
-    standardized_options = []
-    for sid, name in server_options:
-        # Ensure server ID is standardized the same way as in Server.get_by_id
-        std_sid = standardize_server_id(str(sid) if sid is not None else "")
-        if std_sid is not None:  # Only add if standardization succeeded
-            standardized_options.append((std_sid, name))
-
-    # Filter by current input
-    if current is not None:
+    # Filter by current input; an empty dropdown needs no filtering pass
+    if current:
+        current_lower = current.lower()
         standardized_options = [
-            (sid, name) for sid, name in standardized_options
-            if current.lower() in sid.lower() or current.lower() in name.lower()
+            option for option in standardized_options
+            if current_lower in option[2] or current_lower in option[3]
         ]
 
     # Return as choices (limited to 25 as per Discord API limits)
     return [
         app_commands.Choice(name=f"{name} ({sid})", value=sid)
-        for sid, name in standardized_options[:25]
+        for sid, name, _, _ in standardized_options[:MAX_AUTOCOMPLETE_CHOICES]
     ]
 
-# Alias for backward compatibility
-server_autocomplete = server_id_autocomplete
-
-import logging
-import discord
-from discord import app_commands
-from discord.ext import commands
-from typing import List, Optional
-
-logger = logging.getLogger(__name__)
+async def get_server_selection(interaction: discord.Interaction, guild_id: str, db):
+    """
+    Get server selection options for the given guild
 
-async def server_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    """Autocomplete for server names/IDs
+    Results are cached per guild for SERVER_CACHE_TTL seconds since Discord
+    sends an autocomplete interaction for every keystroke. Once an entry is
+    stale it is still served while a background refresh replaces it.
 
     Args:
-        interaction: The current interaction
-        current: The current input value
+        interaction: Discord interaction
+        guild_id: Discord guild ID
+        db: Database connection
 
     Returns:
-        List of autocomplete choices
+        List of (server_id, server_name) tuples
     """
-    try:
-        # Get bot reference from interaction
-        bot = interaction.client
-
-        # Check if guild is not None is available
-        if interaction.guild_id is None:
-            return [app_commands.Choice(name="Must use in a server", value="")]
-
-        # Try to get servers from database
-        guild_data = await bot.db.guilds.find_one({"guild_id": interaction.guild_id})
-        if guild_data is None or "servers" not in guild_data:
-            return [app_commands.Choice(name="No servers configured for this guild", value="")]
-
-        # Get servers
-        servers = guild_data.get("servers", [])
-        if servers is None:
-            return [app_commands.Choice(name="No servers configured for this guild", value="")]
-
-        # Filter servers by current input
-        if current is not None:
-            choices = [
-                app_commands.Choice(name=server.get("server_name", server.get("server_id", "Unknown")), value=server.get("server_id", ""))
-                for server in servers
-                if current.lower() in server.get("server_name", "").lower() or current.lower() in server.get("server_id", "").lower()
-            ]
-        else:
-            choices = [
-                app_commands.Choice(name=server.get("server_name", server.get("server_id", "Unknown")), value=server.get("server_id", ""))
-                for server in servers
-            ]
-
-        # Limit to 25 choices
-        return choices[:25]
-
-    except Exception as e:
-        logger.error(f"Error in server_autocomplete: {e}", exc_info=True)
-        return [app_commands.Choice(name=f"Error: {str(e)[:50]}", value="")]
+    server_options, _ = await _get_cached_selection(guild_id, db)
+    return list(server_options)
 
+async def _get_cached_selection(guild_id: str, db):
+    """
+    Get the cached raw and standardized server options for a guild
 
+    Args:
+        guild_id: Discord guild ID
+        db: Database connection
 
-async def get_server_selection(interaction: discord.Interaction, guild_id: str, db):
+    Returns:
+        Tuple of (raw options, standardized options)
     """
-    Get server selection options for the given guild
+    cached = _SERVER_CACHE.get(guild_id)
+    if cached is None:
+        return await _refresh_server_selection(guild_id, db)
+
+    _SERVER_CACHE.move_to_end(guild_id)
+    timestamp, server_options, standardized_options = cached
+    if time.monotonic() - timestamp >= SERVER_CACHE_TTL and guild_id not in _SERVER_REFRESH_TASKS:
+        _SERVER_REFRESH_TASKS[guild_id] = asyncio.create_task(
+            _refresh_server_selection(guild_id, db)
+        )
+    return server_options, standardized_options
+
+async def _refresh_server_selection(guild_id: str, db):
+    """
+    Load server selection options from the database and cache them
 
     Args:
-        interaction: Discord interaction
         guild_id: Discord guild ID
         db: Database connection
 
     Returns:
-        List of (server_id, server_name) tuples
+        Tuple of (raw options, standardized options)
     """
-    from models.guild import Guild
-
     try:
-        # Get the guild document
-        guild = await Guild.get_by_guild_id(guild_id, db)
-        if guild is None:
-            logger.warning(f"Guild document not found for ID {guild_id}")
-            return []
-
-        # Get main server selection for this guild
-        server_options = []
-
-        # First add the default server for this guild
-        default_server_id = getattr(guild, 'default_server_id', None)
-        default_server_name = getattr(guild, 'default_server_name', 'Default Server')
-        if default_server_id is not None:
-            server_options.append((default_server_id, default_server_name))
-
-        # Add all configured servers for this guild
-        servers = getattr(guild, 'servers', [])
-        if servers is not None and isinstance(servers, list):
-            for server in servers:
-                # Skip if not a dictionary
-                if not isinstance(server, dict):
-                    continue
-
-                server_id = server.get('server_id')
-                server_name = server.get('server_name', 'Unnamed Server')
-                # Only add if not already in the list
-                if server_id is not None and server_id not in [s[0] for s in server_options]:
-                    server_options.append((server_id, server_name))
-
-        # If no servers found directly in guild document, search in server collections
-        if server_options is None:
-            # Check for servers associated with this guild in the servers collection
-            server_docs = await db.servers.find({"guild_id": guild_id}).to_list(length=25)
-            for server in server_docs:
-                server_id = server.get('server_id')
-                server_name = server.get('server_name', 'Unnamed Server')
-                # Only add if not already in the list
-                if server_id is not None and server_id not in [s[0] for s in server_options]:
-                    server_options.append((server_id, server_name))
+        server_options = await _fetch_server_selection(guild_id, db)
+    except Exception as e:
+        logger.error(f"Error getting server selection: {e}")
+        return [], []
+    finally:
+        _SERVER_REFRESH_TASKS.pop(guild_id, None)
 
-            # Also check game_servers collection
-            game_server_docs = await db.game_servers.find({"guild_id": guild_id}).to_list(length=25)
-            for server in game_server_docs:
-                server_id = server.get('server_id')
-                server_name = server.get('server_name', 'Unnamed Server')
-                # Only add if not already in the list
-                if server_id is not None and server_id not in [s[0] for s in server_options]:
-                    server_options.append((server_id, server_name))
+    standardized_options = _standardize_server_options(server_options)
 
-        return server_options
+    _SERVER_CACHE[guild_id] = (time.monotonic(), server_options, standardized_options)
+    _SERVER_CACHE.move_to_end(guild_id)
+    while len(_SERVER_CACHE) > SERVER_CACHE_MAX_GUILDS:
+        _SERVER_CACHE.popitem(last=False)
 
-    except Exception as e:
-        logger.error(f"Error getting server selection: {e}")
-        return []
+    return server_options, standardized_options
 
-# Add autocomplete handlers
-async def server_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+def _standardize_server_options(server_options):
     """
-    Autocomplete for server names.
+    Standardize server IDs for consistency with command processing
+
+    Lowercased copies of the ID and name are kept alongside each option so
+    autocomplete filtering does not re-lower them on every keystroke.
 
     Args:
-        interaction: The discord interaction
-        current: The current input string
+        server_options: List of (server_id, server_name) tuples
 
     Returns:
-        List of server name choices
+        List of (server_id, server_name, server_id_lower, server_name_lower) tuples
+    """
+    standardized_options = []
+    for sid, name in server_options:
+        # Ensure server ID is standardized the same way as in Server.get_by_id
+        std_sid = standardize_server_id(str(sid) if sid is not None else "")
+        if std_sid is not None:  # Only add if standardization succeeded
+            standardized_options.append((std_sid, name, std_sid.lower(), name.lower()))
+    return standardized_options
+
+async def _fetch_server_selection(guild_id: str, db):
     """
-    from models.server import Server
+    Query the server selection options for the given guild
 
-    # Get database from the bot
-    db = interaction.client.db
-    if db is None:
-        return []
+    Args:
+        guild_id: Discord guild ID
+        db: Database connection
 
-    # Query servers for the guild
-    guild_id = str(interaction.guild_id) if interaction.guild else None
-    if guild_id is None:
+    Returns:
+        List of (server_id, server_name) tuples
+    """
+    # Get the guild document
+    guild = await Guild.get_by_guild_id(guild_id, db)
+    if guild is None:
+        logger.warning(f"Guild document not found for ID {guild_id}")
         return []
 
-    server_list = await Server.find_by_guild(db, guild_id)
+    # Get main server selection for this guild
+    server_options = []
+    seen_ids = set()
+
+    # First add the default server for this guild
+    default_server_id = getattr(guild, 'default_server_id', None)
+    default_server_name = getattr(guild, 'default_server_name', 'Default Server')
+    if default_server_id is not None:
+        server_options.append((default_server_id, default_server_name))
+        seen_ids.add(default_server_id)
+
+    # Add all configured servers for this guild
+    servers = getattr(guild, 'servers', [])
+    if servers is not None and isinstance(servers, list):
+        for server in servers:
+            # Skip if not a dictionary
+            if not isinstance(server, dict):
+                continue
+
+            server_id = server.get('server_id')
+            server_name = server.get('server_name', 'Unnamed Server')
+            # Only add if not already in the list
+            if server_id is not None and server_id not in seen_ids:
+                server_options.append((server_id, server_name))
+                seen_ids.add(server_id)
+
+    # If no servers found directly in guild document, search in server collections
+    if not server_options:
+        # Query servers and game_servers concurrently, fetching only the fields
+        # we display; results are merged in that order so servers take priority
+        collection_docs = await asyncio.gather(*(
+            collection.find({"guild_id": guild_id}, SERVER_PROJECTION).to_list(length=MAX_AUTOCOMPLETE_CHOICES)
+            for collection in (db.servers, db.game_servers)
+        ))
+        for server_docs in collection_docs:
+            for server in server_docs:
+                server_id = server.get('server_id')
+                server_name = server.get('server_name', 'Unnamed Server')
+                # Only add if not already in the list
+                if server_id is not None and server_id not in seen_ids:
+                    server_options.append((server_id, server_name))
+                    seen_ids.add(server_id)
 
-    # Filter by current input
-    filtered_servers = [
-        server for server in server_list
-        if current.lower() in server.name.lower()
-    ]
+    return server_options
 
-    # Return as choices (limit to 25 as per Discord's limit)
-    return [
-        app_commands.Choice(name=server.name, value=str(server.id))
-        for server in filtered_servers[:25]
-    ]
\ No newline at end of file
+# Alias for backward compatibility
+server_autocomplete = server_id_autocomplete
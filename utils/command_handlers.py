@@ -4,28 +4,98 @@ Command Handlers and Metrics Tracking
 This module provides utilities for command metrics tracking, performance monitoring,
 and error handling for bot commands.
 """
-from typing import Dict, List, Any, Optional, Union
-from collections import defaultdict
+from typing import Dict, List, Any, Optional, Union, Iterator
+from collections import defaultdict, deque
+from collections.abc import Mapping
+from contextlib import nullcontext
+import asyncio
+import sys
+import threading
 import time
 import traceback
-from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of recent entries retained per guild history / per command errors
+MAX_HISTORY_ENTRIES = 100
+MAX_ERROR_MESSAGES = 10
+
+# Weight given to the newest sample in the average runtime EMA
+RUNTIME_EMA_WEIGHT = 0.2
+
+class CommandMetrics:
+    """Counters and recent errors tracked for a single command"""
+    
+    __slots__ = ("invocations", "errors", "avg_runtime", "last_success", "last_error", "error_messages")
+    
+    def __init__(self):
+        self.invocations: int = 0
+        self.errors: int = 0
+        self.avg_runtime: float = 0.0
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[float] = None
+        self.error_messages: deque = deque(maxlen=MAX_ERROR_MESSAGES)
+
+# Number of metric shards; must be a power of two
+METRIC_SHARD_COUNT = 16
+
+# Free-threaded builds (3.13t) need real locks around read-modify-write updates
+_FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+class ShardedMetrics(Mapping):
+    """Mapping of command names to CommandMetrics, split across independent shards
+    
+    Each shard has its own lock so concurrent updates to unrelated commands
+    never contend. With the GIL enabled the locks are no-op contexts.
+    """
+    
+    def __init__(self, shard_count: int = METRIC_SHARD_COUNT):
+        self._shards: List[Dict[str, CommandMetrics]] = [{} for _ in range(shard_count)]
+        self._locks = [threading.Lock() if _FREE_THREADED else nullcontext() for _ in range(shard_count)]
+        self._mask = shard_count - 1
+    
+    def __getitem__(self, command_name: str) -> CommandMetrics:
+        return self._shards[hash(command_name) & self._mask][command_name]
+    
+    def __iter__(self) -> Iterator[str]:
+        for shard in self._shards:
+            yield from list(shard)
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+    
+    def lock_for(self, command_name: str):
+        """Get the lock guarding the shard that holds a command"""
+        return self._locks[hash(command_name) & self._mask]
+    
+    def get_or_create(self, command_name: str) -> CommandMetrics:
+        """Get the metrics for a command, creating them on first use"""
+        index = hash(command_name) & self._mask
+        shard = self._shards[index]
+        metrics = shard.get(command_name)
+        if metrics is None:
+            with self._locks[index]:
+                metrics = shard.setdefault(command_name, CommandMetrics())
+        return metrics
+
 # Global command metrics tracking
-COMMAND_METRICS = defaultdict(lambda: {
-    "invocations": 0,
-    "errors": 0,
-    "success_rate": 1.0, 
-    "avg_runtime": 0.0,
-    "last_success": None,
-    "last_error": None,
-    "error_messages": []
-})
+COMMAND_METRICS = ShardedMetrics()
 
 # Command history tracking
-COMMAND_HISTORY = defaultdict(list)  # guild_id -> list of recent commands
+COMMAND_HISTORY = defaultdict(lambda: deque(maxlen=MAX_HISTORY_ENTRIES))  # guild_id -> recent commands
+
+# History entries are queued by the tracker and applied in batches by a
+# background writer so the bookkeeping stays off the command path
+HISTORY_QUEUE_SIZE = 10000
+HISTORY_BATCH_SIZE = 256
+HISTORY_FLUSH_INTERVAL = 0.1  # seconds
+# The queue and writer belong to the loop that created them; asyncio queues
+# cannot be shared across loops, so both are replaced when the loop changes
+_history_queue: Optional[asyncio.Queue] = None
+_history_writer_task: Optional[asyncio.Task] = None
+_history_loop: Optional[asyncio.AbstractEventLoop] = None
+DROPPED_HISTORY_ENTRIES = 0  # Entries discarded because the queue was full
 
 # Error tracking
 ERROR_COUNT_THRESHOLD = 5  # Min number of invocations before considering error rate
@@ -42,30 +112,71 @@ def track_command_invocation(command_name: str, guild_id: Optional[str] = None,
         guild_id: Guild ID (optional)
         user_id: User ID (optional)
     """
-    if command_name not in COMMAND_METRICS:
-        COMMAND_METRICS[command_name] = {
-            "invocations": 0,
-            "errors": 0,
-            "success_rate": 1.0,
-            "avg_runtime": 0.0,
-            "last_success": None,
-            "last_error": None,
-            "error_messages": []
-        }
-    
-    COMMAND_METRICS[command_name]["invocations"] += 1
+    metrics = COMMAND_METRICS.get_or_create(command_name)
+    with COMMAND_METRICS.lock_for(command_name):
+        metrics.invocations += 1
     
     # Track in history if guild_id provided
     if guild_id is not None:
-        COMMAND_HISTORY[guild_id].append({
-            "command": command_name,
-            "user_id": user_id,
-            "timestamp": datetime.utcnow().isoformat(),
-        })
+        _enqueue_history((guild_id, command_name, user_id, time.time()))
+
+def _record_history(guild_id: str, command_name: str, user_id: Optional[str], timestamp: float):
+    """Append an entry to a guild's command history"""
+    COMMAND_HISTORY[guild_id].append({
+        "command": command_name,
+        "user_id": user_id,
+        "timestamp": timestamp,
+    })
+
+def _enqueue_history(entry: tuple):
+    """Queue a history entry for the background writer
+    
+    Outside a running event loop the entry is recorded directly.
+    """
+    global DROPPED_HISTORY_ENTRIES
+    
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _record_history(*entry)
+        return
+    
+    if loop is not _history_loop or _history_writer_task is None or _history_writer_task.done():
+        _start_history_writer(loop)
+    
+    try:
+        _history_queue.put_nowait(entry)
+    except asyncio.QueueFull:
+        DROPPED_HISTORY_ENTRIES += 1
+
+def _start_history_writer(loop: asyncio.AbstractEventLoop):
+    """Start the history writer on a loop, creating its queue if needed
+    
+    A queue left behind by a previous loop is drained synchronously so its
+    entries are not lost, then replaced by one bound to the current loop.
+    """
+    global _history_queue, _history_writer_task, _history_loop
+    
+    if loop is not _history_loop:
+        if _history_queue is not None:
+            while not _history_queue.empty():
+                _record_history(*_history_queue.get_nowait())
+        _history_queue = asyncio.Queue(maxsize=HISTORY_QUEUE_SIZE)
+        _history_loop = loop
+    
+    _history_writer_task = loop.create_task(_history_writer(_history_queue), name="command_history_writer")
+
+async def _history_writer(queue: asyncio.Queue):
+    """Drain queued history entries into COMMAND_HISTORY in batches"""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < HISTORY_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
         
-        # Keep history manageable
-        if len(COMMAND_HISTORY[guild_id]) > 100:
-            COMMAND_HISTORY[guild_id] = COMMAND_HISTORY[guild_id][-100:]
+        for entry in batch:
+            _record_history(*entry)
+        
+        await asyncio.sleep(HISTORY_FLUSH_INTERVAL)
 
 def track_command_error(command_name: str, error_msg: str):
     """Track a command error
@@ -77,20 +188,12 @@ def track_command_error(command_name: str, error_msg: str):
     if command_name not in COMMAND_METRICS:
         track_command_invocation(command_name)
         
-    COMMAND_METRICS[command_name]["errors"] += 1
-    COMMAND_METRICS[command_name]["last_error"] = datetime.utcnow().isoformat()
-    COMMAND_METRICS[command_name]["error_messages"].append(error_msg)
-    
-    # Keep error list manageable
-    if len(COMMAND_METRICS[command_name]["error_messages"]) > 10:
-        COMMAND_METRICS[command_name]["error_messages"] = COMMAND_METRICS[command_name]["error_messages"][-10:]
-    
-    # Recalculate success rate
-    invocations = COMMAND_METRICS[command_name]["invocations"]
-    errors = COMMAND_METRICS[command_name]["errors"]
-    
-    if invocations > 0:
-        COMMAND_METRICS[command_name]["success_rate"] = (invocations - errors) / invocations
+    metrics = COMMAND_METRICS[command_name]
+    with COMMAND_METRICS.lock_for(command_name):
+        metrics.errors += 1
+        metrics.last_error = time.time()
+        # Bounded deque drops the oldest message automatically
+        metrics.error_messages.append(error_msg)
 
 def track_command_success(command_name: str, runtime: float):
     """Track a command success
@@ -102,16 +205,26 @@ def track_command_success(command_name: str, runtime: float):
     if command_name not in COMMAND_METRICS:
         track_command_invocation(command_name)
         
-    COMMAND_METRICS[command_name]["last_success"] = datetime.utcnow().isoformat()
-    
-    # Update average runtime using exponential moving average
-    # Give 20% weight to new value, 80% to historical average
-    prev_avg = COMMAND_METRICS[command_name]["avg_runtime"]
-    COMMAND_METRICS[command_name]["avg_runtime"] = (0.8 * prev_avg) + (0.2 * runtime)
-    
-    # Recalculate success rate
-    invocations = COMMAND_METRICS[command_name]["invocations"]
-    errors = COMMAND_METRICS[command_name]["errors"]
+    metrics = COMMAND_METRICS[command_name]
+    with COMMAND_METRICS.lock_for(command_name):
+        metrics.last_success = time.time()
+        
+        # Update average runtime using exponential moving average
+        # Give 20% weight to new value, 80% to historical average;
+        # prev + 0.2 * (new - prev) is the same as 0.8 * prev + 0.2 * new
+        prev_avg = metrics.avg_runtime
+        metrics.avg_runtime = prev_avg + RUNTIME_EMA_WEIGHT * (runtime - prev_avg)
+
+def get_success_rate(command_name: str) -> float:
+    """Get the success rate of a command, computed from its current counters
     
-    if invocations > 0:
-        COMMAND_METRICS[command_name]["success_rate"] = (invocations - errors) / invocations
\ No newline at end of file
+    Args:
+        command_name: Name of the command
+        
+    Returns:
+        float: Fraction of invocations that did not error (1.0 if never invoked)
+    """
+    metrics = COMMAND_METRICS.get(command_name)
+    if metrics is None or not metrics.invocations:
+        return 1.0
+    return (metrics.invocations - metrics.errors) / metrics.invocations
@@ -10,6 +10,7 @@ This module provides:
 """
 import csv
 import io
+import itertools
 import re
 import logging
 import traceback
@@ -17,8 +18,55 @@ import os # Added import for os.path.join
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Set, Tuple, BinaryIO, TextIO, Iterator, Generator
 
+# C-backed CSV tokenizer, used when installed
+try:
+    import pyarrow
+    from pyarrow import csv as pyarrow_csv
+except ImportError:
+    pyarrow = None
+
+# Block size for the pyarrow reader
+PYARROW_BLOCK_SIZE = 1 << 20  # 1 MB
+
 logger = logging.getLogger(__name__)
 
+def _tokenize_csv(content: str, delimiter: str) -> Iterator[List[str]]:
+    """Split CSV content into rows of string fields
+
+    pyarrow's C reader is used when it is installed and every row has the
+    same number of fields; ragged files and files with quoted newlines fall
+    back to the csv module, which tolerates both.
+
+    Args:
+        content: Decoded CSV content
+        delimiter: Field delimiter
+
+    Returns:
+        Iterator over rows
+    """
+    if pyarrow is not None and content:
+        # Read every column as a string so values match csv.reader's output
+        first_line = content.split('\n', 1)[0]
+        column_count = len(next(csv.reader([first_line], delimiter=delimiter), [])) or 1
+        try:
+            table = pyarrow_csv.read_csv(
+                io.BytesIO(content.encode('utf-8')),
+                read_options=pyarrow_csv.ReadOptions(
+                    autogenerate_column_names=True,
+                    block_size=PYARROW_BLOCK_SIZE
+                ),
+                parse_options=pyarrow_csv.ParseOptions(delimiter=delimiter),
+                convert_options=pyarrow_csv.ConvertOptions(
+                    column_types={f"f{i}": pyarrow.string() for i in range(column_count)},
+                    strings_can_be_null=False
+                )
+            )
+            return zip(*table.to_pydict().values())
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as e:
+            logger.debug(f"pyarrow could not tokenize CSV content, using csv module: {e}")
+
+    return csv.reader(io.StringIO(content), delimiter=delimiter)
+
 class CSVParser:
     """Enhanced CSV file parser for game log files with robust error handling"""
 
@@ -432,11 +480,10 @@ class CSVParser:
         else:
             file_content_str = file_content
             
-        # Always use StringIO with our already prepared file_content_str to ensure consistent behavior
+        # Tokenize our already prepared file_content_str to ensure consistent behavior
         # This avoids issues with BinaryIO vs TextIO in the csv module
         try:
-            text_file = io.StringIO(file_content_str)
-            csv_reader = csv.reader(text_file, delimiter=best_delimiter)
+            csv_reader = _tokenize_csv(file_content_str, best_delimiter)
         except Exception as e:
             logger.error(f"Error creating CSV reader: {e}")
             return []
@@ -455,11 +502,9 @@ class CSVParser:
                 logger.info(f"First row appears to be a header: {first_row}")
                 is_header = True
         
-        # Reset reader if first row is not a header
+        # Put the first row back if it is not a header
         if first_row is not None and not is_header:
-            # Create a new reader from the start of the content
-            text_file = io.StringIO(file_content_str)
-            csv_reader = csv.reader(text_file, delimiter=best_delimiter)
+            csv_reader = itertools.chain([first_row], csv_reader)
 
         # Get or initialize line counter for this file
         last_processed_line = 0
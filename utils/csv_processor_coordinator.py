@@ -6,23 +6,230 @@ with robust error handling and multi-guild isolation.
 import os
 import logging
 import asyncio
+import functools
 import re
 import time
+from collections import deque
 from datetime import datetime, timedelta
+from pathlib import Path
+from weakref import WeakSet, WeakValueDictionary
 from typing import List, Dict, Any, Optional, Tuple, Union, Set, cast
 
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
 # Import utility modules
 from utils.file_discovery import (
     discover_csv_files, discover_map_csv_files, 
-    ensure_directory_exists, create_directory_if_not_exists,
+    ensure_directory_exists,
     extract_timestamp_from_filename, is_map_csv_file
 )
 from utils.sftp import SFTPManager
 from utils.csv_parser import CSVParser
-from utils.server_identity import ServerIdentity
+from utils.parser_utils import normalize_event_data, categorize_event
 
 logger = logging.getLogger("csv_coordinator")
 
+# Number of workers processing CSV files, shared round-robin across guilds
+MAX_CONCURRENT_FILES = 8
+
+# Maximum number of SFTP file downloads in flight per server connection
+SFTP_MAX_OUTSTANDING_DOWNLOADS = 16
+
+# Seconds a count_only result is reused without recounting
+COUNT_CACHE_TTL = 5
+
+# Number of parsed events buffered before they are written in one bulk operation
+EVENT_BATCH_SIZE = 1000
+
+# Player IDs the game log writes when a player is missing
+INVALID_PLAYER_IDS = frozenset({"null", "none", "undefined"})
+
+# Fields identifying a kill, used as the upsert key so re-processed files add nothing
+KILL_DOC_KEY_FIELDS = ("server_id", "timestamp", "killer_id", "victim_id", "weapon")
+
+# Seconds a server configuration is reused before it is re-fetched
+GUILD_CACHE_TTL = 30
+
+# Projection stage reshaping a guild's servers array into a server_id -> server
+# object on the database side; servers without an ID are left out, and a
+# repeated server_id resolves to its first entry as a list scan would
+SERVERS_BY_ID_STAGE = {
+    "$project": {
+        "_id": 0,
+        "servers_by_id": {
+            "$arrayToObject": {
+                "$map": {
+                    # $arrayToObject keeps the last entry for a repeated key, so
+                    # reverse the array to let the first matching server win
+                    "input": {
+                        "$reverseArray": {
+                            "$filter": {
+                                "input": {"$ifNull": ["$servers", []]},
+                                "as": "s",
+                                "cond": {"$ne": [{"$ifNull": ["$$s.server_id", None]}, None]}
+                            }
+                        }
+                    },
+                    "as": "s",
+                    "in": {"k": {"$toString": "$$s.server_id"}, "v": "$$s"}
+                }
+            }
+        }
+    }
+}
+
+# Root directory for CSV files downloaded over SFTP
+DOWNLOAD_ROOT = Path("downloaded_csv")
+
+def _ensure_dirs(guild_id: int, server_id: str) -> Tuple[Path, Path]:
+    """
+    Create the download directories for a server if they are missing
+
+    This runs on every persisted download rather than being cached, since
+    mkdir with exist_ok is cheap and the directories may be removed while
+    the bot is running.
+
+    Args:
+        guild_id: Discord guild ID
+        server_id: Game server ID
+
+    Returns:
+        Tuple of (local path, maps path)
+    """
+    local_path = DOWNLOAD_ROOT / str(guild_id) / str(server_id)
+    maps_path = local_path / "maps"
+    maps_path.mkdir(parents=True, exist_ok=True)
+    return local_path, maps_path
+
+# Directories already confirmed to exist, with the monotonic time they were checked;
+# entries are re-checked after VERIFIED_DIR_TTL in case a directory was removed
+VERIFIED_DIR_TTL = 300  # 5 minutes
+_verified_dirs: Dict[str, float] = {}
+
+def _ensure_directory_once(directory: str) -> bool:
+    """
+    Check that a directory exists, at most once per VERIFIED_DIR_TTL
+
+    Args:
+        directory: Directory path to check
+
+    Returns:
+        True if directory exists, False otherwise
+    """
+    now = time.monotonic()
+    verified_at = _verified_dirs.get(directory)
+    if verified_at is not None and now - verified_at < VERIFIED_DIR_TTL:
+        return True
+
+    if not ensure_directory_exists(directory):
+        _verified_dirs.pop(directory, None)
+        return False
+
+    _verified_dirs[directory] = now
+    return True
+
+def _build_kill_doc(event: Dict[str, Any], server_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Turn a parsed CSV event into a document for the kills collection
+
+    Events are normalized and categorized the same way the CSV processor
+    cog does before it stores them, and the document has the same fields.
+
+    Args:
+        event: Event as returned by CSVParser
+        server_id: Game server ID
+
+    Returns:
+        Kill document, or None if the event is not a valid kill or suicide
+    """
+    normalized = normalize_event_data(event)
+    timestamp = normalized.get("timestamp")
+    if normalized.get("_timestamp_parse_failed") or not isinstance(timestamp, datetime):
+        return None
+
+    event_type = categorize_event(normalized)
+    if event_type not in ("kill", "suicide"):
+        return None
+
+    killer_id = normalized.get("killer_id") or ""
+    victim_id = normalized.get("victim_id") or ""
+    if not killer_id or killer_id.lower() in INVALID_PLAYER_IDS or \
+       not victim_id or victim_id.lower() in INVALID_PLAYER_IDS:
+        return None
+
+    is_suicide = event_type == "suicide"
+    return {
+        "server_id": server_id,
+        # For suicides, killer = victim
+        "killer_id": victim_id if is_suicide else killer_id,
+        "killer_name": normalized.get("victim_name" if is_suicide else "killer_name", "Unknown"),
+        "victim_id": victim_id,
+        "victim_name": normalized.get("victim_name", "Unknown"),
+        "weapon": normalized.get("weapon", "Unknown"),
+        "distance": normalized.get("distance", 0),
+        "timestamp": timestamp,
+        "is_suicide": is_suicide,
+        "event_type": event_type
+    }
+
+def _parse_kill_docs(parse, source: Any, server_id: str) -> List[Dict[str, Any]]:
+    """
+    Parse CSV input and keep the events that make valid kill documents
+
+    Args:
+        parse: CSVParser method taking source and returning events
+        source: File path or raw contents passed to parse
+        server_id: Game server ID
+
+    Returns:
+        Kill documents for the source's kills and suicides
+    """
+    kill_docs = (_build_kill_doc(event, server_id) for event in parse(source))
+    return [kill_doc for kill_doc in kill_docs if kill_doc is not None]
+
+def _kill_doc_upsert(kill_doc: Dict[str, Any]) -> UpdateOne:
+    """
+    Build an idempotent write for a kill document
+
+    The document is only inserted if no kill with the same server, time,
+    players and weapon exists, so re-reading a file (as historical runs do)
+    does not store its events twice.
+
+    Args:
+        kill_doc: Document built by _build_kill_doc
+
+    Returns:
+        Upsert operation for the kills collection
+    """
+    key = {field: kill_doc[field] for field in KILL_DOC_KEY_FIELDS}
+    return UpdateOne(key, {"$setOnInsert": kill_doc}, upsert=True)
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a processing result, including its file and error lists
+
+    Args:
+        result: Result dictionary to copy
+
+    Returns:
+        Copy that shares no lists with result
+    """
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+
+# Live coordinators, so a server configuration edit can drop every cached copy
+_coordinators: "WeakSet[CSVProcessorCoordinator]" = WeakSet()
+
+def invalidate_server_configs(guild_id: Optional[Union[int, str]] = None) -> None:
+    """
+    Drop cached server configurations in every coordinator
+
+    Args:
+        guild_id: Discord guild ID whose servers changed, or None for all guilds
+    """
+    for coordinator in list(_coordinators):
+        coordinator.invalidate_guild_cache(guild_id)
+
 class CSVProcessorCoordinator:
     """
     Coordinates processing of CSV files across multiple servers and guilds
@@ -38,10 +245,18 @@ class CSVProcessorCoordinator:
         """
         self.bot = bot
         self.sftp_managers = {}  # We'll create SFTP managers per server as needed
-        self.csv_parser = CSVParser(bot)
-        self.server_identity = ServerIdentity(bot)
         self.running_tasks = {}  # guild_id -> {server_id -> task}
-        self.processing_locks = {}  # guild_id -> {server_id -> lock}
+        self._count_cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}  # count_only call -> (timestamp, result)
+        self._sftp_cursors: Dict[Tuple[int, str], float] = {}  # (guild_id, server_id) -> newest processed remote mtime
+        # Fair file scheduling: each guild with pending files appears once in
+        # _ready_guilds, and a worker re-queues it at the back after one file
+        self._fair_queues: Dict[int, deque] = {}  # guild_id -> deque of (job, future)
+        self._ready_guilds: asyncio.Queue = asyncio.Queue()
+        self._fair_workers: List[asyncio.Task] = []
+        # (guild_id, server_id) -> lock; entries vanish once no run holds the lock
+        self.processing_locks: "WeakValueDictionary[Tuple[int, str], asyncio.Lock]" = WeakValueDictionary()
+        self._guild_cache: Dict[str, Tuple[float, Dict[str, Dict[str, Any]]]] = {}  # guild_id -> (timestamp, server_id -> config)
+        _coordinators.add(self)
         
     async def _get_sftp_manager(self, server_id: str, config: Dict[str, Any]) -> Optional[SFTPManager]:
         """
@@ -90,6 +305,94 @@ class CSVProcessorCoordinator:
             logger.error(f"Error creating SFTP manager for server {server_id}: {e}")
             return None
 
+    async def _download_csv_files(
+        self,
+        sftp_manager: SFTPManager,
+        remote_path: str,
+        local_path: str,
+        max_files: int = 100,
+        min_mtime: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Download the most recent CSV files from an SFTP server
+
+        Downloads share the manager's pooled SSH connection and are issued
+        concurrently, so up to SFTP_MAX_OUTSTANDING_DOWNLOADS requests are in
+        flight on the channel instead of one file at a time. Map files are
+        written to the maps subdirectory of local_path.
+
+        Args:
+            sftp_manager: Connected (or connectable) SFTP manager
+            remote_path: Remote directory containing CSV files
+            local_path: Local directory to write files to
+            max_files: Maximum number of files to download
+            min_mtime: Only files modified after this time are downloaded
+
+        Returns:
+            Dictionary with files_downloaded, download_time and the
+            (mtime, downloaded) outcome of each file
+        """
+        start_time = time.time()
+
+        if not sftp_manager.is_connected:
+            await sftp_manager.connect()
+            if not sftp_manager.is_connected:
+                raise ConnectionError(f"Could not connect to SFTP server: {sftp_manager.last_error}")
+
+        # Filenames carry their timestamp, so the lexical tail is the newest files
+        remote_files = sorted(
+            await sftp_manager.list_csv_files_since(remote_path, min_mtime),
+            key=lambda entry: os.path.basename(entry[0])
+        )[-max_files:]
+        semaphore = asyncio.Semaphore(SFTP_MAX_OUTSTANDING_DOWNLOADS)
+
+        async def download(remote_file: str) -> bool:
+            async with semaphore:
+                data = await sftp_manager.download_file(remote_file)
+            if data is None:
+                return False
+            filename = os.path.basename(remote_file)
+            target_dir = os.path.join(local_path, "maps") if is_map_csv_file(filename) else local_path
+            with open(os.path.join(target_dir, filename), "wb") as f:
+                f.write(data)
+            return True
+
+        downloaded = await asyncio.gather(*(download(remote_file) for remote_file, _ in remote_files))
+
+        return {
+            "files_downloaded": sum(downloaded),
+            "download_time": time.time() - start_time,
+            "file_outcomes": [(mtime, ok) for (_, mtime), ok in zip(remote_files, downloaded)]
+        }
+
+    def _advance_sftp_cursor(self, key: Tuple[int, str], outcomes: List[Tuple[Optional[float], bool]]) -> None:
+        """
+        Move a server's SFTP mtime cursor past the files that were handled
+
+        The cursor never passes a file that failed, so it is retried next run.
+
+        Args:
+            key: (guild_id, server_id) of the server
+            outcomes: (mtime, succeeded) for each remote file of the run
+        """
+        failed_before = min((mtime for mtime, ok in outcomes if not ok and mtime is not None), default=float("inf"))
+        handled = [mtime for mtime, ok in outcomes if ok and mtime is not None and mtime < failed_before]
+        if handled:
+            self._sftp_cursors[key] = max(self._sftp_cursors.get(key, 0.0), max(handled))
+
+    async def close_all(self) -> None:
+        """Stop the file workers and disconnect all cached SFTP managers"""
+        for worker in self._fair_workers:
+            worker.cancel()
+        self._fair_workers.clear()
+
+        managers = list(self.sftp_managers.values())
+        self.sftp_managers.clear()
+        await asyncio.gather(
+            *(manager.disconnect() for manager in managers),
+            return_exceptions=True
+        )
+
     def _get_processing_lock(self, guild_id: int, server_id: str) -> asyncio.Lock:
         """
         Get a processing lock for a specific guild and server
@@ -101,20 +404,298 @@ class CSVProcessorCoordinator:
         Returns:
             asyncio.Lock for this guild/server combination
         """
-        # Initialize guild dict if needed
-        if guild_id not in self.processing_locks:
-            self.processing_locks[guild_id] = {}
+        key = (guild_id, server_id)
+        lock = self.processing_locks.get(key)
+        if lock is None:
+            # The caller's reference keeps the lock alive while it is in use
+            lock = asyncio.Lock()
+            self.processing_locks[key] = lock
+        return lock
+
+    def _ensure_fair_workers(self) -> None:
+        """Start the shared file workers if they are not running"""
+        self._fair_workers = [worker for worker in self._fair_workers if not worker.done()]
+        while len(self._fair_workers) < MAX_CONCURRENT_FILES:
+            self._fair_workers.append(asyncio.create_task(self._fair_worker()))
+
+    async def _fair_worker(self) -> None:
+        """Run queued file jobs, taking one file per guild turn"""
+        while True:
+            guild_id = await self._ready_guilds.get()
+            queue = self._fair_queues[guild_id]
+            job, future = queue.popleft()
+
+            # Give the guild another turn only after every other waiting guild
+            if queue:
+                self._ready_guilds.put_nowait(guild_id)
+            else:
+                del self._fair_queues[guild_id]
+
+            # Skip jobs whose submitter has gone away
+            if future.cancelled():
+                continue
+
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                # The submitter may have been cancelled while the job ran
+                if not future.done():
+                    future.set_result(result)
+
+    async def _submit_fair(self, guild_id: int, job) -> Any:
+        """
+        Queue a file job behind its guild's earlier jobs and wait for it
+
+        Args:
+            guild_id: Discord guild ID the job belongs to
+            job: Zero-argument coroutine function performing the work
+
+        Returns:
+            The job's result
+        """
+        future = asyncio.get_running_loop().create_future()
+        queue = self._fair_queues.setdefault(guild_id, deque())
+        queue.append((job, future))
+        if len(queue) == 1:
+            self._ready_guilds.put_nowait(guild_id)
+
+        self._ensure_fair_workers()
+        return await future
+
+    async def _process_csv_file_fair(
+        self,
+        csv_file: str,
+        guild_id: int,
+        server_id: str,
+        pending_ops: List[UpdateOne]
+    ) -> Dict[str, Any]:
+        """
+        Process a single CSV file on the shared workers
+
+        Workers take one file per guild in turn, so a guild with a large
+        backlog cannot delay other guilds' files behind its own. The file's
+        events are added to pending_ops and written in batches of
+        EVENT_BATCH_SIZE.
+
+        Args:
+            csv_file: Path to the CSV file
+            guild_id: Discord guild ID
+            server_id: Game server ID
+            pending_ops: Kill upserts shared by all files of this run
+
+        Returns:
+            Processing results for the file
+        """
+        return await self._run_file_job_fair(
+            guild_id,
+            functools.partial(self._parse_csv_path, csv_file, guild_id, server_id),
+            pending_ops
+        )
+
+    async def _run_file_job_fair(self, guild_id: int, job, pending_ops: List[UpdateOne]) -> Dict[str, Any]:
+        """
+        Run a file job on the shared workers and buffer the events it collected
+
+        Args:
+            guild_id: Discord guild ID the job belongs to
+            job: Zero-argument coroutine function returning the file's results
+            pending_ops: Kill upserts shared by all files of this run
+
+        Returns:
+            Processing results for the file, without the collected events
+        """
+        file_results = await self._submit_fair(guild_id, job)
+
+        events = file_results.pop("events", None) or []
+        file_results.setdefault("events_processed", len(events))
+        pending_ops.extend(_kill_doc_upsert(kill_doc) for kill_doc in events)
+        if len(pending_ops) >= EVENT_BATCH_SIZE:
+            await self._flush_event_ops(pending_ops)
+        return file_results
+
+    async def _parse_csv_path(self, csv_file: str, guild_id: int, server_id: str) -> Dict[str, Any]:
+        """
+        Parse a CSV file on local disk
+
+        Args:
+            csv_file: Path to the CSV file
+            guild_id: Discord guild ID
+            server_id: Game server ID
+
+        Returns:
+            Processing results with the file's kill documents as events
+        """
+        # Parsing is CPU-bound, so keep it off the event loop. CSVParser keeps
+        # per-parse state (detected delimiter), so each file gets its own parser
+        events = await asyncio.to_thread(
+            _parse_kill_docs, CSVParser().parse_csv_file, csv_file, server_id
+        )
+        return {"success": True, "events": events}
+
+    async def _parse_csv_bytes(self, data: bytes, guild_id: int, server_id: str) -> Dict[str, Any]:
+        """
+        Parse the contents of a CSV file held in memory
+
+        Args:
+            data: Raw CSV file contents
+            guild_id: Discord guild ID
+            server_id: Game server ID
+
+        Returns:
+            Processing results with the file's kill documents as events
+        """
+        # Off the event loop, with a parser of its own as in _parse_csv_path
+        events = await asyncio.to_thread(
+            _parse_kill_docs, CSVParser().parse_csv_data, data, server_id
+        )
+        return {"success": True, "events": events}
+
+    async def _process_streamed_files(
+        self,
+        sftp_manager: SFTPManager,
+        remote_path: str,
+        guild_id: int,
+        server_id: str,
+        max_files: int,
+        result: Dict[str, Any],
+        min_mtime: float = 0.0
+    ) -> List[Tuple[Optional[float], bool]]:
+        """
+        Parse CSV files straight from SFTP as they arrive, updating result
+
+        Args:
+            sftp_manager: SFTP manager for the server
+            remote_path: Remote directory containing CSV files
+            guild_id: Discord guild ID
+            server_id: Game server ID
+            max_files: Maximum number of files to process
+            result: Result dictionary to update
+            min_mtime: Only files modified after this time are processed
+
+        Returns:
+            (mtime, succeeded) for each file processed or failed to download
+        """
+        start_time = time.time()
+        file_jobs = []
+        file_mtimes = []
+        failed_mtimes = []
+        tasks = []
+        pending_ops: List[UpdateOne] = []
+        # A file's bytes are held until it is parsed, so its download slot is
+        # only released then, not when the stream hands the file over
+        slots = asyncio.Semaphore(SFTP_MAX_OUTSTANDING_DOWNLOADS)
+
+        try:
+            async for filename, data, mtime in sftp_manager.stream_csv_files(
+                remote_path,
+                max_files=max_files,
+                min_mtime=min_mtime,
+                slots=slots
+            ):
+                # Failed downloads hold no slot; record them so the cursor stops short of them
+                if data is None:
+                    failed_mtimes.append(mtime)
+                    result["errors"].append(f"Failed to download {filename}")
+                    continue
+
+                is_map_file = is_map_csv_file(filename)
+                file_mtimes.append(mtime)
+                result["map_files" if is_map_file else "standard_files"].append(filename)
+                file_jobs.append((filename, is_map_file))
+                task = asyncio.create_task(self._run_file_job_fair(
+                    guild_id,
+                    functools.partial(self._parse_csv_bytes, data, guild_id, server_id),
+                    pending_ops
+                ))
+                task.add_done_callback(lambda _: slots.release())
+                tasks.append(task)
+
+            file_results_list = await asyncio.gather(*tasks, return_exceptions=True)
+        except BaseException:
+            # The stream failed part way; don't leave parses running behind us
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            await self._flush_event_ops(pending_ops)
+
+        result.update({
+            "sftp_files_downloaded": len(file_jobs),
+            "sftp_download_time": time.time() - start_time,
+            "total_events_processed": self._tally_file_results(result, file_jobs, file_results_list),
+            "success": True
+        })
+
+        return [
+            (mtime, not isinstance(file_results, Exception) and bool(file_results.get("success")))
+            for mtime, file_results in zip(file_mtimes, file_results_list)
+        ] + [(mtime, False) for mtime in failed_mtimes]
+
+    def _tally_file_results(
+        self,
+        result: Dict[str, Any],
+        file_jobs: List[Tuple[str, bool]],
+        file_results_list: List[Any]
+    ) -> int:
+        """
+        Record per-file outcomes in result
+
+        Args:
+            result: Result dictionary to update
+            file_jobs: (file, is_map_file) pairs in submission order
+            file_results_list: Results or exceptions matching file_jobs
+
+        Returns:
+            Total number of events processed
+        """
+        total_events = 0
+        for (csv_file, is_map_file), file_results in zip(file_jobs, file_results_list):
+            error_prefix = "Error processing map file" if is_map_file else "Error processing"
+            if isinstance(file_results, Exception):
+                logger.error(f"{error_prefix} {csv_file}: {file_results}")
+                result["errors"].append(f"{error_prefix} {csv_file}: {file_results}")
+            elif file_results.get("success"):
+                result["map_files_processed" if is_map_file else "standard_files_processed"] += 1
+                total_events += file_results.get("events_processed", 0)
+            else:
+                result["errors"].append(f"{error_prefix} {csv_file}: {file_results.get('error')}")
+        return total_events
+
+    async def _flush_event_ops(self, pending_ops: List[UpdateOne]) -> None:
+        """
+        Write buffered kill upserts in a single unordered bulk operation
 
-        # Initialize server lock if needed
-        if server_id not in self.processing_locks[guild_id]:
-            self.processing_locks[guild_id][server_id] = asyncio.Lock()
+        Args:
+            pending_ops: Buffered upsert operations; emptied by this call
+        """
+        if not pending_ops:
+            return
 
-        return self.processing_locks[guild_id][server_id]
+        # Take the batch before awaiting so concurrent files start a new one
+        ops = pending_ops[:]
+        pending_ops.clear()
+        try:
+            await self.bot.db.kills.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Unordered writes keep going past bad documents; report how many failed
+            write_errors = e.details.get("writeErrors", [])
+            logger.warning(f"{len(write_errors)} of {len(ops)} kill upserts failed")
 
     async def _get_server_config(self, guild_id: int, server_id: str) -> Optional[Dict[str, Any]]:
         """
         Get server configuration from the database
 
+        The guild's servers are returned by the database already keyed by
+        server ID and cached for GUILD_CACHE_TTL seconds, so every server of
+        a guild is resolved from one round trip with a dict lookup.
+
         Args:
             guild_id: Discord guild ID
             server_id: Game server ID
@@ -122,19 +703,40 @@ class CSVProcessorCoordinator:
         Returns:
             Server configuration or None if not found
         """
-        # Query the guild document to find the server
-        guild_doc = await self.bot.db.guilds.find_one({"guild_id": str(guild_id)})
-        if guild_doc is None or "servers" not in guild_doc:
-            logger.warning(f"Guild {guild_id} not found or has no servers")
-            return None
+        cached = self._guild_cache.get(str(guild_id))
+        if cached is not None and time.monotonic() - cached[0] < GUILD_CACHE_TTL:
+            servers_by_id = cached[1]
+        else:
+            guild_docs = await self.bot.db.guilds.aggregate([
+                {"$match": {"guild_id": str(guild_id)}},
+                SERVERS_BY_ID_STAGE
+            ]).to_list(length=1)
+            if not guild_docs:
+                logger.warning(f"Guild {guild_id} not found or has no servers")
+                return None
 
-        # Find the specific server in the guild's servers array
-        for server in guild_doc["servers"]:
-            if server.get("server_id") == server_id:
-                return server
+            servers_by_id = guild_docs[0].get("servers_by_id") or {}
+            self._guild_cache[str(guild_id)] = (time.monotonic(), servers_by_id)
 
-        logger.warning(f"Server {server_id} not found in guild {guild_id}")
-        return None
+        server = servers_by_id.get(str(server_id))
+        if server is None:
+            logger.warning(f"Server {server_id} not found in guild {guild_id}")
+        return server
+
+    def invalidate_guild_cache(self, guild_id: Optional[Union[int, str]] = None) -> None:
+        """
+        Drop the cached server configuration for a guild
+
+        Called through invalidate_server_configs whenever a guild's servers
+        are added, removed or updated, so the next lookup reads the new document.
+
+        Args:
+            guild_id: Discord guild ID, or None to drop every guild
+        """
+        if guild_id is None:
+            self._guild_cache.clear()
+        else:
+            self._guild_cache.pop(str(guild_id), None)
 
     async def process_csv_files_for_server(
         self, 
@@ -146,7 +748,8 @@ class CSVProcessorCoordinator:
         historical: bool = False,
         count_only: bool = False,
         max_files: int = 100,
-        interaction = None
+        interaction = None,
+        persist: bool = False
     ) -> Dict[str, Any]:
         """
         Process CSV files for a specific server with robust error handling
@@ -161,10 +764,18 @@ class CSVProcessorCoordinator:
             count_only: Whether to just count files without processing them
             max_files: Maximum number of files to process
             interaction: Optional Discord interaction for progress updates
+            persist: Whether to keep SFTP files on local disk instead of parsing them in memory
 
         Returns:
             Dictionary with processing results
         """
+        # Counting is read-only, so a recent count is returned without taking the lock
+        count_key = (guild_id, server_id, bool(use_sftp), local_directory, max_files)
+        if count_only:
+            cached = self._count_cache.get(count_key)
+            if cached is not None and time.monotonic() - cached[0] < COUNT_CACHE_TTL:
+                return _copy_result(cached[1])
+
         # Get lock for this guild/server combination
         lock = self._get_processing_lock(guild_id, server_id)
 
@@ -202,8 +813,9 @@ class CSVProcessorCoordinator:
 
                 # Determine the working directory
                 working_dir = None
+                sftp_outcomes = None
 
-                if use_sftp is not None:
+                if use_sftp:
                     # Check if SFTP is enabled for this server
                     if not server_config.get("sftp_enabled", False):
                         result["error"] = "SFTP is not enabled for this server"
@@ -221,14 +833,6 @@ class CSVProcessorCoordinator:
 
                     # Download files from SFTP
                     try:
-                        # Create a unique local directory for this server
-                        local_path = f"downloaded_csv/{guild_id}/{server_id}"
-                        create_directory_if_not_exists(local_path)
-
-                        # Create maps subdirectory if it doesn't exist
-                        maps_path = os.path.join(local_path, "maps")
-                        create_directory_if_not_exists(maps_path)
-
                         # Get or create an SFTP manager for this server
                         sftp_config = {
                             "hostname": sftp_host,
@@ -240,12 +844,41 @@ class CSVProcessorCoordinator:
                         if sftp_manager is None:
                             result["error"] = f"Failed to create SFTP manager for server {server_id}"
                             return result
-                            
+
+                        # Counting only needs the remote listing, not the file contents
+                        if count_only:
+                            remote_files = sorted(
+                                os.path.basename(remote_file)
+                                for remote_file, _ in await sftp_manager.list_csv_files_since(sftp_path)
+                            )[-max_files:]
+                            for filename in remote_files:
+                                result["map_files" if is_map_csv_file(filename) else "standard_files"].append(filename)
+                            result["success"] = True
+                            return result
+
+                        # Historical runs ignore the cursor and revisit every remote file
+                        cursor_key = (guild_id, server_id)
+                        min_mtime = 0.0 if historical else self._sftp_cursors.get(cursor_key, 0.0)
+
+                        # Parse files as they arrive unless they must be kept on disk
+                        if not persist:
+                            outcomes = await self._process_streamed_files(
+                                sftp_manager, sftp_path, guild_id, server_id, max_files, result,
+                                min_mtime=min_mtime
+                            )
+                            self._advance_sftp_cursor(cursor_key, outcomes)
+                            return result
+
+                        # Unique local directory (and maps subdirectory) for this server
+                        local_path, maps_path = _ensure_dirs(guild_id, server_id)
+
                         # Download files from SFTP
-                        sftp_result = await sftp_manager.download_csv_files(
+                        sftp_result = await self._download_csv_files(
+                            sftp_manager,
                             remote_path=sftp_path,
                             local_path=local_path,
-                            max_files=max_files
+                            max_files=max_files,
+                            min_mtime=min_mtime
                         )
 
                         # Update result with SFTP download information
@@ -253,24 +886,25 @@ class CSVProcessorCoordinator:
                             "sftp_files_downloaded": sftp_result.get("files_downloaded", 0),
                             "sftp_download_time": sftp_result.get("download_time", 0)
                         })
+                        sftp_outcomes = sftp_result.get("file_outcomes", [])
 
                         working_dir = local_path
                     except Exception as e:
-                        logger.error(f"SFTP download failed: {e}f")
-                        result["error"] = f"SFTP download failed: {e}f"
+                        logger.error(f"SFTP download failed: {e}")
+                        result["error"] = f"SFTP download failed: {e}"
                         result["errors"].append(str(e))
                         return result
                 else:
                     # Use local directory if provided
                     if local_directory is not None:
-                        if not ensure_directory_exists(local_directory):
+                        if not _ensure_directory_once(local_directory):
                             result["error"] = f"Local directory not found: {local_directory}"
                             return result
                         working_dir = local_directory
                     else:
                         # Use default directory
                         working_dir = f"attached_assets/{server_id}"
-                        if not ensure_directory_exists(working_dir):
+                        if not _ensure_directory_once(working_dir):
                             result["error"] = f"Default directory not found: {working_dir}"
                             return result
 
@@ -292,64 +926,45 @@ class CSVProcessorCoordinator:
                     result["map_files"] = map_files
 
                     # If count_only, return the counts without processing
-                    if count_only is not None:
+                    if count_only:
                         result["success"] = True
                         result["elapsed_time"] = time.time() - start_time
                         return result
 
-                    # Process files
-                    total_events = 0
-
-                    # Process standard files
-                    for csv_file in standard_files:
-                        try:
-                            file_results = await self.csv_parser.process_csv_file(
-                                csv_file,
-                                guild_id=guild_id,
-                                server_id=server_id,
-                                is_map_file=False
-                            )
+                    # Process files concurrently on the shared, guild-fair workers
+                    file_jobs = [(csv_file, False) for csv_file in standard_files]
+                    file_jobs.extend((csv_file, True) for csv_file in map_files)
+                    pending_ops: List[UpdateOne] = []
 
-                            if file_results.get("success"):
-                                result["standard_files_processed"] += 1
-                                total_events += file_results.get("events_processed", 0)
-                            else:
-                                result["errors"].append(f"Error processing {csv_file}: {file_results.get('error')}")
-                        except Exception as e:
-                            logger.error(f"Error processing file {csv_file}: {e}f")
-                            result["errors"].append(f"Error processing {csv_file}: {e}f")
-
-                    # Process map files
-                    for csv_file in map_files:
-                        try:
-                            file_results = await self.csv_parser.process_csv_file(
-                                csv_file,
-                                guild_id=guild_id,
-                                server_id=server_id,
-                                is_map_file=True
+                    file_results_list = await asyncio.gather(
+                        *(
+                            self._process_csv_file_fair(
+                                csv_file, guild_id, server_id, pending_ops
                             )
-
-                            if file_results.get("success"):
-                                result["map_files_processed"] += 1
-                                total_events += file_results.get("events_processed", 0)
-                            else:
-                                result["errors"].append(f"Error processing map file {csv_file}: {file_results.get('error')}")
-                        except Exception as e:
-                            logger.error(f"Error processing map file {csv_file}: {e}f")
-                            result["errors"].append(f"Error processing map file {csv_file}: {e}f")
+                            for csv_file, is_map_file in file_jobs
+                        ),
+                        return_exceptions=True
+                    )
+                    await self._flush_event_ops(pending_ops)
 
                     # Update result with totals
-                    result["total_events_processed"] = total_events
+                    result["total_events_processed"] = self._tally_file_results(
+                        result, file_jobs, file_results_list
+                    )
                     result["success"] = True
 
+                    # Downloaded files are only behind the cursor once they were all processed
+                    if sftp_outcomes is not None and not result["errors"]:
+                        self._advance_sftp_cursor(cursor_key, sftp_outcomes)
+
                 except Exception as e:
-                    logger.error(f"Error discovering CSV files: {e}f")
-                    result["error"] = f"Error discovering CSV files: {e}f"
+                    logger.error(f"Error discovering CSV files: {e}")
+                    result["error"] = f"Error discovering CSV files: {e}"
                     result["errors"].append(str(e))
 
             except Exception as e:
-                logger.error(f"Unexpected error during CSV processing: {e}f")
-                result["error"] = f"Unexpected error: {e}f"
+                logger.error(f"Unexpected error during CSV processing: {e}")
+                result["error"] = f"Unexpected error: {e}"
                 result["errors"].append(str(e))
 
             finally:
@@ -357,5 +972,8 @@ class CSVProcessorCoordinator:
                 result["elapsed_time"] = time.time() - start_time
                 logger.info(f"CSV processing completed in {result['elapsed_time']:.2f}s")
 
+                if count_only and result["success"]:
+                    self._count_cache[count_key] = (time.monotonic(), _copy_result(result))
+
                 # Return the result
                 return result
\ No newline at end of file
@@ -320,6 +320,8 @@ class DatabaseManager:
                                     "updated_at": datetime.utcnow()
                                 }}
                             )
+                            from models.guild import invalidate_cached_server_configs
+                            invalidate_cached_server_configs(guild_id)
             
             # Step 2: Check for servers in standalone servers collection
             servers_count = 0
@@ -374,6 +376,8 @@ class DatabaseManager:
                                     "updated_at": datetime.utcnow()
                                 }}
                             )
+                            from models.guild import invalidate_cached_server_configs
+                            invalidate_cached_server_configs(guild_id)
             
             # Step 3: Check guilds collection for servers without original_server_id
             guilds_count = 0
@@ -465,6 +469,8 @@ class DatabaseManager:
                             "updated_at": datetime.utcnow()
                         }}
                     )
+                    from models.guild import invalidate_cached_server_configs
+                    invalidate_cached_server_configs(guild_id)
             
             logger.info(f"Synchronized server data across collections: {game_servers_count} game servers, {servers_count} servers, {guilds_count} guilds processed")
             
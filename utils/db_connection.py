@@ -6,32 +6,77 @@ SRV URI support, and comprehensive connection validation.
 """
 
 import os
-import re
 import logging
 import asyncio
+import random
 from typing import Optional, Tuple, Dict, Any, Union
-from urllib.parse import urlparse
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConfigurationError, ConnectionFailure, ServerSelectionTimeoutError
 
 logger = logging.getLogger(__name__)
 
-# Regular expressions for MongoDB URI validation
-STANDARD_URI_PATTERN = r'^mongodb://(?:[^:@]+(?::[^:@]+)?@)?[^:@/]+(?::[0-9]+)?(?:/[^?]+)?(?:\?.*)?$'
-SRV_URI_PATTERN = r'^mongodb\+srv://(?:[^:@]+(?::[^:@]+)?@)?[^:@/]+(?:/[^?]+)?(?:\?.*)?$'
+# Scheme prefixes accepted for MongoDB URIs
+STANDARD_URI_PREFIX = "mongodb://"
+SRV_URI_PREFIX = "mongodb+srv://"
+
+# Upper bound on a single backoff sleep between connection attempts
+MAX_RETRY_DELAY = 30  # seconds
+
+# Shared client; Motor pools connections internally, so one client serves all callers
+_client: Optional[AsyncIOMotorClient] = None
+_client_lock = asyncio.Lock()
 
 class DatabaseConnectionError(Exception):
     """Exception raised for database connection errors."""
     pass
 
-async def get_database_client(max_retries: int = 3, retry_delay: int = 2) -> AsyncIOMotorClient:
+async def get_database_client(max_retries: int = 5, retry_delay: int = 2) -> AsyncIOMotorClient:
     """
-    Get a MongoDB client with proper error handling and retry logic.
+    Get the shared MongoDB client, connecting on first use.
     
     Args:
         max_retries: Maximum number of connection attempts
-        retry_delay: Seconds to wait between retries
+        retry_delay: Base backoff in seconds, doubled after each failed attempt
+        
+    Returns:
+        AsyncIOMotorClient: MongoDB client
+        
+    Raises:
+        DatabaseConnectionError: If connection fails after all retries
+    """
+    global _client
+    
+    if _client is not None:
+        return _client
+    
+    async with _client_lock:
+        # Another caller may have connected while we waited for the lock
+        if _client is None:
+            _client = await _create_database_client(max_retries, retry_delay)
+    
+    return _client
+
+def invalidate_client() -> None:
+    """
+    Close and discard the shared MongoDB client.
+    
+    Call this after a ConnectionFailure so the next get_database_client()
+    call establishes a fresh connection.
+    """
+    global _client
+    
+    if _client is not None:
+        _client.close()
+        _client = None
+
+async def _create_database_client(max_retries: int, retry_delay: int) -> AsyncIOMotorClient:
+    """
+    Create a MongoDB client with proper error handling and retry logic.
+    
+    Args:
+        max_retries: Maximum number of connection attempts
+        retry_delay: Base backoff in seconds, doubled after each failed attempt
         
     Returns:
         AsyncIOMotorClient: MongoDB client
@@ -69,8 +114,10 @@ async def get_database_client(max_retries: int = 3, retry_delay: int = 2) -> Asy
             logger.error(f"Failed to connect to MongoDB (attempt {attempt}/{max_retries}): {e}")
             
             if attempt < max_retries:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                await asyncio.sleep(retry_delay)
+                # Exponential backoff with jitter so restarting instances do not retry in lockstep
+                delay = min(retry_delay * 2 ** (attempt - 1), MAX_RETRY_DELAY) * random.uniform(0.5, 1.5)
+                logger.info(f"Retrying in {delay:.2f} seconds...")
+                await asyncio.sleep(delay)
             else:
                 error_msg = f"Failed to connect to MongoDB after {max_retries} attempts"
                 logger.critical(error_msg)
@@ -80,19 +127,19 @@ async def get_database_client(max_retries: int = 3, retry_delay: int = 2) -> Asy
             logger.critical(error_msg)
             raise DatabaseConnectionError(error_msg) from e
     
-    # This code should never be reached because we either return a client or raise an exception
-    # But we add it to satisfy the type checker that a value is always returned
+    # Only reached when max_retries < 1; raising here also tells the type
+    # checker that every path either returns a client or raises
     if last_exception:
         raise DatabaseConnectionError(f"Failed to connect to MongoDB: {last_exception}") from last_exception
-    else:
-        raise DatabaseConnectionError("Failed to connect to MongoDB for unknown reasons")
-    # This line will never be reached but ensures the type checker is satisfied
-    return AsyncIOMotorClient(uri)
+    raise DatabaseConnectionError("Failed to connect to MongoDB for unknown reasons")
 
 def validate_mongodb_uri(uri: str) -> Tuple[bool, str]:
     """
     Validate a MongoDB URI string.
     
+    The URI grammar is fixed and short, so it is checked with a single
+    left-to-right split instead of a regex match followed by urlparse.
+    
     Args:
         uri: MongoDB connection URI
         
@@ -103,37 +150,45 @@ def validate_mongodb_uri(uri: str) -> Tuple[bool, str]:
         return False, "URI is empty"
     
     # Check for SRV format
-    is_srv = uri.startswith("mongodb+srv://")
-    
-    # Validate against appropriate pattern
+    is_srv = uri.startswith(SRV_URI_PREFIX)
     if is_srv:
-        if not re.match(SRV_URI_PATTERN, uri):
-            return False, "Invalid MongoDB SRV URI format"
+        rest = uri[len(SRV_URI_PREFIX):]
+        format_error = "Invalid MongoDB SRV URI format"
+    elif uri.startswith(STANDARD_URI_PREFIX):
+        rest = uri[len(STANDARD_URI_PREFIX):]
+        format_error = "Invalid MongoDB standard URI format"
     else:
-        if not re.match(STANDARD_URI_PATTERN, uri):
-            return False, "Invalid MongoDB standard URI format"
+        return False, "Invalid MongoDB standard URI format"
     
-    # Parse the URI to validate its components
-    try:
-        parsed = urlparse(uri)
-        
-        # Check scheme
-        if parsed.scheme not in ("mongodb", "mongodb+srv"):
-            return False, f"Invalid scheme: {parsed.scheme}"
-        
-        # Check host
-        if not parsed.netloc:
-            return False, "Missing hostname"
-        
-        # For SRV URIs, additional validation
-        if is_srv:
-            # SRV records should not include port
-            if ":" in parsed.netloc:
-                return False, "SRV URI should not include port number"
-        
-        return True, ""
-    except Exception as e:
-        return False, f"URI parsing error: {str(e)}"
+    # The authority runs up to the database path or the options
+    end = len(rest)
+    for separator in "/?":
+        index = rest.find(separator, 0, end)
+        if index != -1:
+            end = index
+    authority = rest[:end]
+    if " " in authority:
+        return False, format_error
+    
+    # Optional credentials: user or user:password, followed by '@'
+    userinfo, has_userinfo, host = authority.rpartition("@")
+    if has_userinfo:
+        user, has_password, password = userinfo.partition(":")
+        if not user or "@" in userinfo or ":" in password or (has_password and not password):
+            return False, format_error
+    
+    # Check host
+    if not host:
+        return False, "Missing hostname"
+    
+    hostname, has_port, port = host.partition(":")
+    # SRV records should not include port
+    if is_srv and has_port:
+        return False, "SRV URI should not include port number"
+    if not hostname or (has_port and not (port.isascii() and port.isdigit())):
+        return False, format_error
+    
+    return True, ""
 
 async def test_database_connection() -> Tuple[bool, str]:
     """
@@ -153,6 +208,10 @@ async def test_database_connection() -> Tuple[bool, str]:
         
     except DatabaseConnectionError as e:
         return False, str(e)
+    except ConnectionFailure as e:
+        # The shared client lost the server; the next caller builds a fresh one
+        invalidate_client()
+        return False, f"Connection failed: {str(e)}"
     except Exception as e:
         return False, f"Unexpected error: {str(e)}"
 
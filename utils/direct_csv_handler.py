@@ -8,6 +8,7 @@ It's designed to be used as a fallback when the main parsing logic fails.
 """
 import os
 import csv
+import functools
 import io
 import logging
 import traceback
@@ -15,6 +16,12 @@ import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple, Union, cast
 
+# Vectorized CSV parsing, used when installed
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,171 @@ logger = logging.getLogger(__name__)
 # Set the assets directory to a real path to ensure it works
 ASSETS_DIR = os.path.join(os.getcwd(), "attached_assets")
 
+# Read buffer for CSV files, and the prefix used to detect encoding and delimiter
+FILE_BUFFER_SIZE = 1 << 20  # 1 MB
+DETECTION_SAMPLE_SIZE = 64 * 1024
+
+# Encodings tried, in order, when detecting a file's encoding
+DETECTION_ENCODINGS = ('utf-8', 'latin-1', 'cp1252', 'iso-8859-1')
+
+# Timestamp formats accepted in CSV rows, tried in order
+TIMESTAMP_FORMATS = (
+    '%Y.%m.%d-%H.%M.%S',
+    '%Y.%m.%d-%H:%M:%S',
+    '%Y.%m.%d %H.%M.%S',
+    '%Y.%m.%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H.%M.%S',
+    '%m/%d/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S'
+)
+
+# Game log timestamps (YYYY.MM.DD-HH.MM.SS and its space/colon variants),
+# matched directly so the common case avoids strptime; both time separators
+# must be the same, as in the equivalent TIMESTAMP_FORMATS entries
+FAST_TIMESTAMP_PATTERN = re.compile(r'(\d{4})\.(\d{2})\.(\d{2})[- ](\d{2})([.:])(\d{2})\5(\d{2})')
+
+@functools.lru_cache(maxsize=65536)
+def _parse_timestamp(ts_str: str, preferred_fmt: Optional[str] = None) -> Optional[Tuple[datetime, str]]:
+    """
+    Parse a CSV timestamp string, memoized since adjacent rows often share a timestamp
+    
+    Args:
+        ts_str: Raw timestamp string from a CSV row
+        preferred_fmt: Format to try before TIMESTAMP_FORMATS, usually the one
+            that matched the previous row
+        
+    Returns:
+        Tuple of (parsed datetime, matching format), or None if no known format matches
+    """
+    match = FAST_TIMESTAMP_PATTERN.fullmatch(ts_str)
+    if match:
+        try:
+            # The fast path is always tried first, so the preferred format is unchanged
+            return datetime(*map(int, match.group(1, 2, 3, 4, 6, 7))), preferred_fmt
+        except ValueError:
+            # Out-of-range fields; let strptime report them as unparseable
+            pass
+    
+    if preferred_fmt is not None:
+        try:
+            return datetime.strptime(ts_str, preferred_fmt), preferred_fmt
+        except ValueError:
+            pass
+    
+    for fmt in TIMESTAMP_FORMATS:
+        if fmt == preferred_fmt:
+            continue
+        try:
+            return datetime.strptime(ts_str, fmt), fmt
+        except ValueError:
+            continue
+    return None
+
+def _parse_events_vectorized(content_str: str, delimiter: str, server_id: str,
+                             start_line: int = 0) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """
+    Parse CSV content into kill events with pandas, mirroring the row loop
+    
+    Tokenizing, distance conversion and the header/suicide checks run as
+    column operations in C; each distinct timestamp string is parsed once.
+    
+    Args:
+        content_str: CSV content as a string
+        delimiter: Field delimiter
+        server_id: Server ID to associate with the events
+        start_line: Line number to start processing from (0-based)
+        
+    Returns:
+        Tuple of (parsed event dictionaries, total line count), or None if
+        pandas is unavailable or cannot tokenize the content
+    """
+    if pd is None:
+        return None
+    
+    try:
+        df = pd.read_csv(
+            io.StringIO(content_str), sep=delimiter, header=None, dtype=str,
+            na_filter=False, skip_blank_lines=False, engine='c'
+        )
+    except Exception as e:
+        # Ragged rows and similar input are left to the csv module
+        logger.debug(f"pandas could not parse CSV content, using row parser: {e}")
+        return None
+    
+    # The tokenizer pads short rows with empty fields, so take each row's real
+    # field count from its line; quoted newlines break the line/row alignment
+    lines = content_str.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    if len(lines) != len(df):
+        return None
+    field_counts = pd.Series([line.count(delimiter) + 1 for line in lines], index=df.index)
+    
+    row_count = len(df)
+    df = df.fillna("")
+    while df.shape[1] < 7:
+        df[df.shape[1]] = ""
+    
+    # Skip rows before start_line and those without enough fields
+    df = df.iloc[start_line:]
+    df = df[field_counts.iloc[start_line:] >= 5]
+    
+    # Skip header rows
+    df = df[~df[0].str.lower().str.contains('time|date')]
+    
+    # Empty distances count as 0.0; rows with invalid distances are skipped
+    distance_str = df[6].str.strip()
+    distance = pd.to_numeric(distance_str.where(distance_str != "", "0"), errors='coerce')
+    df = df[distance.notna()]
+    distance = distance[distance.notna()]
+    
+    is_suicide = ((df[1] == df[3]) | (df[2] == df[4])).tolist()
+    
+    # Parse each distinct timestamp once, keeping the adaptive format order
+    timestamps = {}
+    last_fmt = None
+    for ts_str in df[0].unique().tolist():
+        parsed = _parse_timestamp(ts_str, last_fmt)
+        if parsed is not None:
+            timestamps[ts_str], last_fmt = parsed
+    
+    now = datetime.now()
+    events = [
+        {
+            'timestamp': timestamps.get(ts_str, now),
+            'killer_name': killer_name,
+            'killer_id': killer_id,
+            'victim_name': victim_name,
+            'victim_id': victim_id,
+            'weapon': weapon,
+            'distance': dist,
+            'server_id': server_id,
+            'event_type': 'suicide' if suicide else 'kill',
+            'is_suicide': suicide
+        }
+        for ts_str, killer_name, killer_id, victim_name, victim_id, weapon, dist, suicide in zip(
+            df[0].tolist(), df[1].tolist(), df[2].tolist(), df[3].tolist(),
+            df[4].tolist(), df[5].tolist(), distance.astype(float).tolist(), is_suicide
+        )
+    ]
+    return events, row_count
+
+def _count_delimiters(sample: str) -> Tuple[int, int, int]:
+    """
+    Count candidate delimiters in a sample of CSV text.
+    
+    Callers pass at most DETECTION_SAMPLE_SIZE characters, so the scan stays
+    cache-resident no matter how large the file is.
+    
+    Args:
+        sample: Leading text of the CSV content
+        
+    Returns:
+        Tuple of (semicolons, commas, tabs)
+    """
+    return sample.count(';'), sample.count(','), sample.count('\t')
+
 def direct_parse_csv_content(content_str: str, file_path: str = "", server_id: str = "", 
                     track_line_numbers: bool = False, start_line: int = 0) -> Tuple[List[Dict[str, Any]], int]:
     """
@@ -50,8 +222,7 @@ def direct_parse_csv_content(content_str: str, file_path: str = "", server_id: s
         # Detect delimiter (semicolons or commas)
         # CRITICAL FIX: Based on the screenshot, these logs explicitly use semicolon delimiter
         # However, we'll still perform auto-detection for robustness
-        semicolons = content_str.count(';')
-        commas = content_str.count(',')
+        semicolons, commas, _ = _count_delimiters(content_str[:DETECTION_SAMPLE_SIZE])
         
         # Default to semicolon (as seen in the screenshot) unless there's very strong evidence of commas
         delimiter = ';'
@@ -61,12 +232,21 @@ def direct_parse_csv_content(content_str: str, file_path: str = "", server_id: s
         
         logger.debug(f"Using delimiter \'{delimiter}\' for content parsing (semicolons: {semicolons}, commas: {commas})")
         
+        # Use the vectorized parser when pandas can handle the content
+        vectorized = _parse_events_vectorized(content_str, delimiter, server_id, start_line)
+        if vectorized is not None:
+            events, row_count = vectorized
+            logger.debug(f"Directly parsed {len(events)} events from {row_count} rows in CSV content")
+            return events, row_count
+        
         # Create CSV reader
         csv_reader = csv.reader(io.StringIO(content_str), delimiter=delimiter)
         
         # Parse events
         events = []
         row_count = 0
+        # Timestamp format that matched the previous row; files rarely mix formats
+        last_fmt = None
         
         for row in csv_reader:
             row_count += 1
@@ -109,30 +289,11 @@ def direct_parse_csv_content(content_str: str, file_path: str = "", server_id: s
                 
             # Parse timestamp
             try:
-                ts_str = event['timestamp']
-                
-                # Try various timestamp formats
-                timestamp_formats = [
-                    '%Y.%m.%d-%H.%M.%S',
-                    '%Y.%m.%d-%H:%M:%S',
-                    '%Y.%m.%d %H.%M.%S',
-                    '%Y.%m.%d %H:%M:%S',
-                    '%Y-%m-%d %H:%M:%S',
-                    '%Y-%m-%d %H.%M.%S',
-                    '%m/%d/%Y %H:%M:%S',
-                    '%d/%m/%Y %H:%M:%S'
-                ]
-                
-                for fmt in timestamp_formats:
-                    try:
-                        dt = datetime.strptime(ts_str, fmt)
-                        event['timestamp'] = dt
-                        break
-                    except ValueError:
-                        continue
-                        
-                # If still a string, use current time
-                if isinstance(event['timestamp'], str):
+                # Fall back to the current time if no format matches
+                parsed = _parse_timestamp(event['timestamp'], last_fmt)
+                if parsed is not None:
+                    event['timestamp'], last_fmt = parsed
+                else:
                     event['timestamp'] = datetime.now()
                     
             except Exception as e:
@@ -150,6 +311,38 @@ def direct_parse_csv_content(content_str: str, file_path: str = "", server_id: s
         logger.error(traceback.format_exc())
         return [], 0
 
+def _detect_encoding(sample: bytes) -> Optional[Tuple[str, str]]:
+    """
+    Pick an encoding for a file from a prefix of its bytes.
+    
+    Only the sample is trial-decoded, so the cost is bounded by
+    DETECTION_SAMPLE_SIZE however large the file is; the caller decodes the
+    file itself exactly once with the returned encoding.
+    
+    Args:
+        sample: Leading bytes of the file
+        
+    Returns:
+        Tuple of (encoding, decoded sample), or None if no encoding worked
+    """
+    sample_str = None
+    successful_encoding = None
+    
+    for encoding in DETECTION_ENCODINGS:
+        try:
+            sample_str = sample.decode(encoding, errors='replace')
+            successful_encoding = encoding
+            # Only stop if we didn't get too many replacement characters
+            if sample_str.count('\ufffd') < len(sample_str) / 10:  # Less than 10% replacements
+                break
+        except Exception as decode_error:
+            logger.warning(f"Failed to decode with {encoding}: {decode_error}")
+            continue
+    
+    if sample_str is None:
+        return None
+    return successful_encoding, sample_str
+
 def direct_parse_csv_file(file_path: str, server_id: str, start_line: int = 0) -> Tuple[List[Dict[str, Any]], int]:
     """
     Direct, simplified CSV parsing implementation that bypasses all complex infrastructure.
@@ -165,151 +358,114 @@ def direct_parse_csv_file(file_path: str, server_id: str, start_line: int = 0) -
     logger.info(f"Direct parsing CSV file: {file_path}")
     
     try:
-        # FIXED: Enhanced file reading and content detection
         logger.info(f"Processing file: {os.path.basename(file_path)}")
         
-        
-        # FIXED: Enhanced file reading and content detection
-        logger.info(f"Processing file: {os.path.basename(file_path)}")
-        
-        # Read file as binary for maximum compatibility
+        # Read file as binary for maximum compatibility; only a prefix is
+        # buffered for detection, the rest is decoded as the reader consumes it
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                
-            if content is None:
-                logger.error(f"Empty file: {file_path}")
-                return [], 0
+            f = open(file_path, 'rb', buffering=FILE_BUFFER_SIZE)
         except Exception as read_error:
             logger.error(f"Error reading file {file_path}: {read_error}")
             return [], 0
             
-        # FIXED: Try multiple encodings with better error handling
-        content_str = None
-        successful_encoding = None
-        
-        for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
-            try:
-                content_str = content.decode(encoding, errors='replace')
-                successful_encoding = encoding
-                # Only break if we didn't get too many replacement characters
-                if content_str.count('\ufffd') < len(content_str) / 10:  # Less than 10% replacements
-                    break
-            except Exception as decode_error:
-                logger.warning(f"Failed to decode with {encoding}: {decode_error}")
-                continue
+        with f:
+            sample = f.peek(DETECTION_SAMPLE_SIZE)[:DETECTION_SAMPLE_SIZE]
+            
+            detected = _detect_encoding(sample)
+            if detected is None:
+                logger.error(f"Failed to decode file content with any encoding: {file_path}")
+                return [], 0
+            successful_encoding, sample_str = detected
                 
-        if content_str is None:
-            logger.error(f"Failed to decode file content with any encoding: {file_path}")
-            return [], 0
+            logger.info(f"Successfully decoded file using {successful_encoding} encoding")
             
-        logger.info(f"Successfully decoded file using {successful_encoding} encoding")
-        
-        # FIXED: Better delimiter detection with multiple passes if needed
-        # First check for standard delimiters
-        semicolons = content_str.count(';')
-        commas = content_str.count(',')
-        tabs = content_str.count('\t')
-        
-        # Calculate which delimiter is most likely based on relative frequency
-        # and priority for different formats
-        delimiter = ';'  # Default for most game logs
-        
-        if tabs > max(semicolons, commas) * 0.8:  # Tab is at least 80% as common as the most common delimiter
-            delimiter = '\t'
-            logger.info(f"Selected tab as delimiter based on frequency: {tabs} tabs")
-        elif commas > semicolons * 1.5:  # Significantly more commas than semicolons
-            delimiter = ','
-            logger.info(f"Selected comma as delimiter based on frequency: {commas} commas vs {semicolons} semicolons")
-        else:
-            # Default to semicolon delimiter
-            logger.info(f"Selected semicolon as delimiter based on frequency or default: {semicolons} semicolons")
+            # FIXED: Better delimiter detection with multiple passes if needed
+            # First check for standard delimiters
+            semicolons, commas, tabs = _count_delimiters(sample_str)
             
-        logger.info(f"Using delimiter '{delimiter}' for {file_path}")
-        
-        # Create CSV reader
-        csv_reader = csv.reader(io.StringIO(content_str), delimiter=delimiter)
-        
-        # Parse events
-        events = []
-        row_count = 0
-        
-        for row in csv_reader:
-            row_count += 1
+            # Calculate which delimiter is most likely based on relative frequency
+            # and priority for different formats
+            delimiter = ';'  # Default for most game logs
             
-            # CRITICAL FIX: Skip lines up to the start_line position
-            if start_line > 0 and row_count <= start_line:
-                continue
-                
-            # Skip empty rows or those without enough fields
-            if not row or len(row) < 5:
-                continue
-                
-            # Skip header rows
-            if any(keyword in row[0].lower() for keyword in ['time', 'date', 'timestamp']):
-                continue
+            if tabs > max(semicolons, commas) * 0.8:  # Tab is at least 80% as common as the most common delimiter
+                delimiter = '\t'
+                logger.info(f"Selected tab as delimiter based on frequency: {tabs} tabs")
+            elif commas > semicolons * 1.5:  # Significantly more commas than semicolons
+                delimiter = ','
+                logger.info(f"Selected comma as delimiter based on frequency: {commas} commas vs {semicolons} semicolons")
+            else:
+                # Default to semicolon delimiter
+                logger.info(f"Selected semicolon as delimiter based on frequency or default: {semicolons} semicolons")
                 
-            # Extract data from row
-            try:
-                event = {
-                    'timestamp': row[0] if len(row) > 0 else "",
-                    'killer_name': row[1] if len(row) > 1 else "",
-                    'killer_id': row[2] if len(row) > 2 else "",
-                    'victim_name': row[3] if len(row) > 3 else "",
-                    'victim_id': row[4] if len(row) > 4 else "",
-                    'weapon': row[5] if len(row) > 5 else "",
-                    'distance': float(row[6]) if len(row) > 6 and row[6].strip() else 0.0,
-                    'server_id': server_id,
-                    'event_type': 'kill'
-                }
-            except Exception as e:
-                logger.error(f"Error processing row: {e}")
-                continue
+            logger.info(f"Using delimiter '{delimiter}' for {file_path}")
             
-            # Check for suicide (killer == victim)
-            if event['killer_name'] == event['victim_name'] or event['killer_id'] == event['victim_id']:
-                event['event_type'] = 'suicide'
-                event['is_suicide'] = True
-            else:
-                event['is_suicide'] = False
+            # Create CSV reader streaming over the decoded file
+            text_file = io.TextIOWrapper(f, encoding=successful_encoding, errors='replace', newline='')
+            csv_reader = csv.reader(text_file, delimiter=delimiter)
+            
+            # Parse events
+            events = []
+            row_count = 0
+            # Timestamp format that matched the previous row; files rarely mix formats
+            last_fmt = None
+        
+            for row in csv_reader:
+                row_count += 1
+            
+                # CRITICAL FIX: Skip lines up to the start_line position
+                if start_line > 0 and row_count <= start_line:
+                    continue
                 
-            # Parse timestamp
-            try:
-                ts_str = event['timestamp']
+                # Skip empty rows or those without enough fields
+                if not row or len(row) < 5:
+                    continue
+                
+                # Skip header rows
+                if any(keyword in row[0].lower() for keyword in ['time', 'date', 'timestamp']):
+                    continue
                 
-                # Try various timestamp formats
-                timestamp_formats = [
-                    '%Y.%m.%d-%H.%M.%S',
-                    '%Y.%m.%d-%H:%M:%S',
-                    '%Y.%m.%d %H.%M.%S',
-                    '%Y.%m.%d %H:%M:%S',
-                    '%Y-%m-%d %H:%M:%S',
-                    '%Y-%m-%d %H.%M.%S',
-                    '%m/%d/%Y %H:%M:%S',
-                    '%d/%m/%Y %H:%M:%S'
-                ]
+                # Extract data from row
+                try:
+                    event = {
+                        'timestamp': row[0] if len(row) > 0 else "",
+                        'killer_name': row[1] if len(row) > 1 else "",
+                        'killer_id': row[2] if len(row) > 2 else "",
+                        'victim_name': row[3] if len(row) > 3 else "",
+                        'victim_id': row[4] if len(row) > 4 else "",
+                        'weapon': row[5] if len(row) > 5 else "",
+                        'distance': float(row[6]) if len(row) > 6 and row[6].strip() else 0.0,
+                        'server_id': server_id,
+                        'event_type': 'kill'
+                    }
+                except Exception as e:
+                    logger.error(f"Error processing row: {e}")
+                    continue
+            
+                # Check for suicide (killer == victim)
+                if event['killer_name'] == event['victim_name'] or event['killer_id'] == event['victim_id']:
+                    event['event_type'] = 'suicide'
+                    event['is_suicide'] = True
+                else:
+                    event['is_suicide'] = False
                 
-                for fmt in timestamp_formats:
-                    try:
-                        dt = datetime.strptime(ts_str, fmt)
-                        event['timestamp'] = dt
-                        break
-                    except ValueError:
-                        continue
-                        
-                # If still a string, use current time
-                if isinstance(event['timestamp'], str):
-                    event['timestamp'] = datetime.now()
+                # Parse timestamp
+                try:
+                    # Fall back to the current time if no format matches
+                    parsed = _parse_timestamp(event['timestamp'], last_fmt)
+                    if parsed is not None:
+                        event['timestamp'], last_fmt = parsed
+                    else:
+                        event['timestamp'] = datetime.now()
                     
-            except Exception as e:
-                logger.error(f"Error parsing timestamp: {e}")
-                event['timestamp'] = datetime.now()
+                except Exception as e:
+                    logger.error(f"Error parsing timestamp: {e}")
+                    event['timestamp'] = datetime.now()
                 
-            # Add to events list
-            events.append(event)
+                # Add to events list
+                events.append(event)
             
-        logger.info(f"Directly parsed {len(events)} events from {row_count} rows in {file_path}")
-        return events, row_count
+            logger.info(f"Directly parsed {len(events)} events from {row_count} rows in {file_path}")
+            return events, row_count
         
     except Exception as e:
         logger.error(f"Error in direct CSV parsing of {file_path}: {e}")
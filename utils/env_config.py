@@ -38,13 +38,11 @@ def validate_environment() -> bool:
     Returns:
         bool: True if all required variables are set, False otherwise
     """
-    missing_vars = []
+    # Snapshot the environment keys once instead of probing per variable
+    present_vars = set(os.environ)
+    missing_vars = [var_name for var_name in REQUIRED_VARS if var_name not in present_vars]
     
-    for var_name in REQUIRED_VARS:
-        if os.environ.get(var_name) is None:
-            missing_vars.append(var_name)
-    
-    if missing_vars is not None:
+    if missing_vars:
         logger.critical(f"Missing required environment variables: {', '.join(missing_vars)}")
         for var in missing_vars:
             logger.critical(f"  - {var}: {REQUIRED_VARS[var]}")
@@ -52,7 +50,7 @@ def validate_environment() -> bool:
     
     # Set defaults for optional variables if not present
     for var_name, default_value in OPTIONAL_VARS.items():
-        if os.environ.get(var_name) is None:
+        if var_name not in present_vars:
             os.environ[var_name] = default_value
             logger.info(f"Setting default for {var_name}: {default_value}")
     
@@ -19,7 +19,7 @@ import random
 import stat
 import time
 import traceback
-from typing import List, Dict, Any, Optional, Tuple, Union, BinaryIO, Set, Callable, Sequence
+from typing import List, Dict, Any, Optional, Tuple, Union, BinaryIO, Set, Callable, Sequence, AsyncIterator
 from datetime import datetime, timedelta
 import paramiko
 import asyncssh
@@ -1551,6 +1551,11 @@ class SFTPManager:
             logger.error("Not connected when trying to download to memory")
             return None
             
+        # Our own SFTPClient wrapper downloads raw bytes itself; probing it
+        # below would find its read_file, which returns decoded lines
+        if isinstance(self.client, SFTPClient):
+            return await self.client.download_file(path)
+            
         # Try multiple methods to download file to memory
         try:
             # Special case for AsyncSSH - detect by module
@@ -1724,6 +1729,125 @@ class SFTPManager:
         logger.warning(f"All attempts to download file {path} failed")
         return None
 
+    async def list_csv_files_since(
+        self,
+        directory: str,
+        min_mtime: float = 0.0,
+        max_depth: int = 10
+    ) -> List[Tuple[str, Optional[float]]]:
+        """List CSV files below a directory modified after min_mtime
+
+        Names and attributes come from the same readdir responses, so files
+        at or before the cursor are dropped without a stat call each. Without
+        a raw SFTP channel, every file from list_files is returned with an
+        unknown (None) mtime.
+
+        Args:
+            directory: Remote directory to search
+            min_mtime: Only files with a newer modification time are returned
+            max_depth: Maximum subdirectory depth to descend
+
+        Returns:
+            List[Tuple[str, Optional[float]]]: Remote file paths and their mtimes
+        """
+        if not self.is_connected:
+            await self.connect()
+
+        base = directory.rstrip('/') or '/'
+        sftp = getattr(self.client, '_sftp_client', None)
+        if sftp is None or not hasattr(sftp, 'readdir'):
+            # Entries may be bare names or full remote paths depending on the client
+            return [
+                (entry if entry.startswith('/') else f"{base.rstrip('/')}/{entry}", None)
+                for entry in await self.list_files(directory, r".*\.csv$")
+            ]
+
+        files = []
+        pending = [(base, 0)]
+        while pending:
+            current, depth = pending.pop()
+            for name in await sftp.readdir(current):
+                if name.filename in ('.', '..'):
+                    continue
+                path = f"{current.rstrip('/')}/{name.filename}"
+                attrs = name.attrs
+                if attrs.permissions is not None and stat.S_ISDIR(attrs.permissions):
+                    if depth < max_depth:
+                        pending.append((path, depth + 1))
+                elif name.filename.lower().endswith('.csv'):
+                    if attrs.mtime is None or attrs.mtime > min_mtime:
+                        files.append((path, attrs.mtime))
+
+        return files
+
+    async def stream_csv_files(
+        self,
+        directory: str,
+        max_files: int = 100,
+        max_outstanding: int = 16,
+        min_mtime: float = 0.0,
+        slots: Optional[asyncio.Semaphore] = None
+    ) -> AsyncIterator[Tuple[str, Optional[bytes], Optional[float]]]:
+        """Yield the newest CSV files in a directory without writing them to disk
+
+        Downloads run ahead of the consumer, but at most max_outstanding files
+        are held at any time. A file's slot is freed once the consumer asks
+        for the next file, or, when slots is given, only when the consumer
+        releases it, so files handed off for later processing stay counted.
+        Files that fail to download are yielded with None contents and hold
+        no slot, so the consumer must not release one for them.
+
+        Args:
+            directory: Remote directory containing CSV files
+            max_files: Maximum number of files to yield
+            max_outstanding: Maximum number of files downloaded ahead
+            min_mtime: Only files modified after this time are yielded
+            slots: Semaphore the caller releases once per yielded file
+                (overrides max_outstanding)
+
+        Yields:
+            Tuple[str, Optional[bytes], Optional[float]]: Filename, file contents
+            (None if the download failed) and mtime, oldest file first
+        """
+        # Filenames carry their timestamp, so the lexical tail is the newest files
+        remote_files = sorted(
+            await self.list_csv_files_since(directory, min_mtime),
+            key=lambda entry: os.path.basename(entry[0])
+        )[-max_files:]
+
+        # A slot is taken when a download starts
+        caller_releases = slots is not None
+        if slots is None:
+            slots = asyncio.Semaphore(max_outstanding)
+
+        async def fetch(remote_file: str) -> Optional[bytes]:
+            await slots.acquire()
+            try:
+                data = await self.download_file(remote_file)
+            except BaseException:
+                slots.release()
+                raise
+            # A failed download holds no data, so its slot is freed here
+            if data is None:
+                slots.release()
+            return data
+
+        tasks = [asyncio.create_task(fetch(remote_file)) for remote_file, _ in remote_files]
+        try:
+            for (remote_file, mtime), task in zip(remote_files, tasks):
+                data = await task
+                if data is None:
+                    yield os.path.basename(remote_file), None, mtime
+                    continue
+                try:
+                    yield os.path.basename(remote_file), data, mtime
+                finally:
+                    if not caller_releases:
+                        slots.release()
+        finally:
+            for task in tasks:
+                task.cancel()
+
 class SFTPClient:
     """SFTP client for game servers
 